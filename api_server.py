@@ -7,20 +7,71 @@ import json
 import threading
 import time
 import base64
+import hashlib
+import struct
+from dataclasses import dataclass, asdict
+from typing import Optional
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import selectors
 from datetime import datetime
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import subprocess
 import signal
+import shutil
+import platform
+import traceback
 import psutil
 
 try:
     from PIL import Image
-    import io
 except ImportError:
     print("[WARN] PIL not installed, run: pip install Pillow")
 
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    print("[WARN] OpenCV not installed, run: pip install opencv-python numpy")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    print("[WARN] orjson not installed, falling back to json (pip install orjson)")
+
+if orjson is not None:
+    class OrjsonProvider(DefaultJSONProvider):
+        """Flask JSON provider backed by orjson (jsonify and request.json)"""
+        def _dumps_bytes(self, obj):
+            return orjson.dumps(obj, default=self.default,
+                                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+        def dumps(self, obj, **kwargs):
+            return self._dumps_bytes(obj).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+        def response(self, *args, **kwargs):
+            # Hand orjson's bytes straight to the response instead of bytes -> str -> bytes
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(self._dumps_bytes(obj), mimetype=self.mimetype)
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = FileSystemEventHandler = None
+    print("[WARN] watchdog not installed, /api/results/latest scans the results folder (pip install watchdog)")
+
+_IS_WINDOWS = platform.system() == 'Windows'
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for Laravel communication
 
 # Configuration - Use Laravel magicQC storage for annotations
@@ -30,102 +81,766 @@ ANNOTATIONS_PATH = os.path.join(LARAVEL_STORAGE_PATH, 'annotations')
 # Local annotation storage (fallback)
 LOCAL_ANNOTATIONS_PATH = os.path.join(os.path.dirname(__file__), 'temp_annotations')
 
+# Scratch directory for annotations/images received from the database
+TEMP_ANNOTATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp_annotations')
+
 # Local storage for results
 LOCAL_STORAGE_PATH = os.path.join(os.path.dirname(__file__), 'storage')
 RESULTS_PATH = os.path.join(LOCAL_STORAGE_PATH, 'measurement_results')
 CONFIG_FILE = 'measurement_config.json'
 
-# Ensure directories exist
-os.makedirs(LOCAL_STORAGE_PATH, exist_ok=True)
-os.makedirs(RESULTS_PATH, exist_ok=True)
-os.makedirs(LOCAL_ANNOTATIONS_PATH, exist_ok=True)
+# Reference image MIME type -> file extension
+EXT_MAP = {
+    'image/jpeg': '.jpg',
+    'image/jpg': '.jpg',
+    'image/png': '.png',
+    'image/bmp': '.bmp',
+    'image/gif': '.gif'
+}
+
+# Image extensions probed next to annotation JSON files
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+# Garment sizes accepted by /api/register/start
+_VALID_SIZES = frozenset(('S', 'M', 'L', 'XL', 'XXL'))
+_VALID_SIZES_MSG = 'S, M, L, XL, XXL'
+
+# Environment for spawned worker scripts, built once (restart the server to pick up env changes)
+WORKER_ENV = {**os.environ, 'PYTHONIOENCODING': 'utf-8'}
+# Worker scripts live next to this file
+WORKER_CWD = os.path.dirname(os.path.abspath(__file__))
+
+# Parsed JSON files keyed by path -> ((mtime_ns, size), data), see _cached_json()
+JSON_CACHE_MAX_FILES = 64
+_json_cache = {}
+
+# Log every converted percentage keypoint (PRIORITY-2 path)
+DEBUG_POINTS = False
+
+# Base64 characters decoded per step when writing uploaded images (multiple of 4, ~3 MB decoded)
+BASE64_CHUNK_CHARS = 4 << 20
+
+# Cached /api/annotations/list result, keyed on the annotations directory mtime.
+# Annotation files change rarely, while the UI dropdowns poll the listing.
+ANNOTATION_CACHE_TTL = 2.0  # seconds
+_anno_cache = {'mtime': 0, 'built_at': 0.0, 'payload': None, 'etag': None, 'index': {}}
 
 # Global state
 measurement_process = None
-measurement_status = {
-    'running': False,
-    'annotation_name': None,
-    'status': 'idle',
-    'error': None,
-    'start_time': None
-}
+# Pre-started measurement_worker.py --standby; it exits by itself when our end of its stdin closes
+_standby_worker = None
+_standby_lock = threading.Lock()
+# Shared selector for process exit notifications (see _watch_process)
+_proc_selector = None
+_proc_selector_lock = threading.Lock()
+# Measurement runs; each holds its thread for the whole measurement. The bound allows the
+# current run plus superseded runs still draining after _stop_measurement_process().
+_MEASUREMENT_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix='measurement-run')
+# Exit watchers for calibration/registration workers where pidfd is unavailable (always on Windows);
+# one thread per live worker, kept apart so a long measurement can never queue a watcher (or vice versa)
+_WATCH_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='worker-wait')
+# Reference image prep for start_measurement, overlapped with annotation parsing on the request thread
+_PREP_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ref-prep')
+# Set on server exit so pool threads stop waiting and the interpreter can shut down
+_shutdown_event = threading.Event()
+
+@dataclass
+class MeasurementStatus:
+    """State of the current measurement run, shared by request threads and the run thread"""
+    running: bool = False
+    annotation_name: Optional[str] = None
+    status: str = 'idle'
+    error: Optional[str] = None
+    start_time: Optional[float] = None
+
+@dataclass
+class ProcStatus:
+    """State of a calibration or registration worker run"""
+    running: bool = False
+    size: Optional[str] = None
+    status: str = 'idle'
+    error: Optional[str] = None
+    step: Optional[str] = None
+
+# measurement_status, _status_rev, _measurement_run and _worker_exited are guarded by _status_lock
+measurement_status = MeasurementStatus()
+_status_lock = threading.Lock()
+# Bumped on every measurement_status change; served as the /api/measurement/status ETag
+_status_rev = 0
+# Identifies the current run so a finished/stopped run thread can't overwrite a newer run's status
+_measurement_run = 0
+# Set by the run thread once its worker process has exited
+_worker_exited = threading.Event()
+_worker_exited.set()
+
+def _json_loads(data):
+    """Parse JSON text or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(data, sort_keys=False):
+    """Serialize data to compact JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS if sort_keys else None)
+    return json.dumps(data, sort_keys=sort_keys, separators=(',', ':')).encode('utf-8')
+
+def _read_json_file(path):
+    """Load a JSON file"""
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
+
+def _cached_json(path, st=None):
+    """Load a JSON file, re-parsing only when its mtime or size changed.
+    
+    Pass st if the caller already stat'ed path. The returned object is
+    shared between requests - copy it before mutating.
+    """
+    if st is None:
+        st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    entry = _json_cache.get(path)
+    if entry is not None and entry[0] == key:
+        return entry[1]
+    
+    # Key the entry on the fstat of what was actually read (the file may have been replaced since)
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        data = _json_loads(f.read())
+    key = (st.st_mtime_ns, st.st_size)
+    if len(_json_cache) >= JSON_CACHE_MAX_FILES:
+        _json_cache.pop(next(iter(_json_cache)), None)  # Drop the oldest entry
+    _json_cache[path] = (key, data)
+    return data
+
+# Static response bodies, serialized once
+_NO_RESULTS_BODY = b'{"status":"success","data":null,"message":"No results found"}'
+
+def _not_modified(etag):
+    """Empty 304 response for a matching If-None-Match"""
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+def _err(message, code=500):
+    """Error envelope response, serialized without going through jsonify"""
+    return app.response_class(_json_dumps({'status': 'error', 'message': message}),
+                              status=code, mimetype='application/json')
+
+def _set_measurement_status(run_id=None, **fields):
+    """Update measurement_status and bump its revision; ignored if run_id is no longer the current run"""
+    global _status_rev
+    with _status_lock:
+        if run_id is not None and run_id != _measurement_run:
+            return False
+        for name, value in fields.items():
+            setattr(measurement_status, name, value)
+        _status_rev += 1
+        return True
+
+def _measurement_snapshot():
+    """Consistent (status dict, revision) pair for serialization"""
+    with _status_lock:
+        return asdict(measurement_status), _status_rev
+
+def _stop_measurement_process(timeout=2.0):
+    """Ask the running worker to exit; walk and kill its process tree only if it doesn't"""
+    global _measurement_run
+    with _status_lock:
+        proc, exited = measurement_process, _worker_exited
+        _measurement_run += 1  # Retire the run so its thread doesn't report the kill as a failure
+    if proc is None:
+        return
+    try:
+        proc.terminate()
+    except OSError:
+        pass
+    if exited.wait(timeout):
+        return
+    
+    print("[WARN] Measurement worker did not exit, killing process tree")
+    try:
+        parent = psutil.Process(proc.pid)
+        procs = [parent, *parent.children(recursive=True)]
+    except psutil.NoSuchProcess:
+        return  # Exited between the wait and the walk
+    
+    # Terminate the whole tree, reap it in one wait, then kill whatever is left
+    for p in procs:
+        try:
+            p.terminate()
+        except psutil.NoSuchProcess:
+            pass
+    _, alive = psutil.wait_procs(procs, timeout=0.5)
+    for p in alive:
+        try:
+            p.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+def _write_bytes(path, data):
+    """Write a whole payload with raw os.write calls (normally a single syscall)"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def _write_json_file(path, data, indent=True):
+    """Write data to path as JSON, serialized up front and written in one go.
+    
+    indent=False writes compact JSON, for files only the worker scripts read
+    (stdlib json only uses its C encoder when there is no indent).
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        payload = orjson.dumps(data, option=option)
+    elif indent:
+        payload = json.dumps(data, indent=4).encode('utf-8')
+    else:
+        payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    _write_bytes(path, payload)
+
+def _decode_base64_to_file(data, path):
+    """Decode Base64 text to path in bounded chunks instead of one full-size bytes object.
+    
+    Returns the number of bytes written.
+    """
+    written = 0
+    pending = ''
+    with open(path, 'wb', buffering=1 << 20) as f:
+        for start in range(0, len(data), BASE64_CHUNK_CHARS):
+            # Drop line breaks/whitespace so every decoded slice stays 4-character aligned
+            chunk = pending + ''.join(data[start:start + BASE64_CHUNK_CHARS].split())
+            cut = len(chunk) - len(chunk) % 4
+            pending = chunk[cut:]
+            decoded = base64.b64decode(chunk[:cut])
+            f.write(decoded)
+            written += len(decoded)
+        if pending:
+            decoded = base64.b64decode(pending)
+            f.write(decoded)
+            written += len(decoded)
+    return written
+
+def _upscale_image(img, target_w, target_h):
+    """Bicubic upscale, on the GPU when OpenCV was built with CUDA and a device is present"""
+    try:
+        if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+            gpu = cv2.cuda_GpuMat()
+            gpu.upload(img)
+            return cv2.cuda.resize(gpu, (target_w, target_h), interpolation=cv2.INTER_CUBIC).download()
+    except (AttributeError, cv2.error):
+        pass  # No CUDA support in this OpenCV build
+    return cv2.resize(img, (target_w, target_h), interpolation=cv2.INTER_CUBIC)
+
+def _proc_loop():
+    """Reactor thread: run the exit callback of every watched process whose pidfd fires"""
+    while True:
+        for key, _ in _proc_selector.select():
+            try:
+                key.data()
+            except Exception as e:
+                print(f"[ERR] Process exit callback failed: {e}")
+
+def _on_pidfd_ready(proc, on_exit, fd):
+    """pidfd became readable: the process has exited"""
+    _proc_selector.unregister(fd)
+    os.close(fd)
+    proc.wait()  # Reaps immediately
+    on_exit(proc)
+
+def _wait_process(proc):
+    """proc.wait() that gives up on server shutdown; returns the exit code, or None if abandoned"""
+    while not _shutdown_event.is_set():
+        try:
+            return proc.wait(timeout=0.5)
+        except subprocess.TimeoutExpired:
+            pass
+    return None
+
+def _watch_process(proc, on_exit):
+    """Call on_exit(proc) from a background thread once proc has exited.
+    
+    On Linux 5.3+ all watched processes share one epoll reactor over pidfds;
+    elsewhere each process takes a _WATCH_POOL thread blocked in proc.wait().
+    """
+    global _proc_selector
+    fd = None
+    if hasattr(os, 'pidfd_open'):
+        try:
+            fd = os.pidfd_open(proc.pid)
+        except OSError:
+            fd = None  # Kernel without pidfd support
+    
+    if fd is not None:
+        with _proc_selector_lock:
+            if _proc_selector is None:
+                _proc_selector = selectors.DefaultSelector()
+                threading.Thread(target=_proc_loop, daemon=True).start()
+            _proc_selector.register(fd, selectors.EVENT_READ, functools.partial(_on_pidfd_ready, proc, on_exit, fd))
+        return
+    
+    def wait_and_report():
+        if _wait_process(proc) is not None:
+            on_exit(proc)
+    _WATCH_POOL.submit(wait_and_report)
+
+def _spawn_measurement_worker(standby=False):
+    """Launch measurement_worker.py; a standby worker imports everything, then waits on stdin"""
+    cmd = ['python', 'measurement_worker.py']
+    kwargs = {
+        'env': WORKER_ENV,
+        'cwd': WORKER_CWD
+    }
+    if standby:
+        cmd.append('--standby')
+        kwargs['stdin'] = subprocess.PIPE
+    if _IS_WINDOWS:
+        # On Windows, use CREATE_NEW_CONSOLE to:
+        # 1. Show a visible console window for debugging
+        # 2. Allow OpenCV GUI windows to display
+        # This makes it easier to see errors and camera output
+        kwargs['creationflags'] = subprocess.CREATE_NEW_CONSOLE
+        if standby:
+            # Keep the idle console hidden, the worker shows it once it gets a job
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = 0  # SW_HIDE
+            kwargs['startupinfo'] = startupinfo
+    return subprocess.Popen(cmd, **kwargs)
+
+def _prewarm_measurement_worker():
+    """Make sure a standby measurement worker is waiting for the next job"""
+    global _standby_worker
+    with _standby_lock:
+        if _standby_worker is not None and _standby_worker.poll() is None:
+            return
+        try:
+            _standby_worker = _spawn_measurement_worker(standby=True)
+        except Exception as e:
+            _standby_worker = None
+            print(f"[WARN] Could not pre-warm measurement worker: {e}")
+
+def _take_standby_worker():
+    """Start the standby worker on the config just written, or None if there is no usable one"""
+    global _standby_worker
+    with _standby_lock:
+        proc, _standby_worker = _standby_worker, None
+    if proc is None or proc.poll() is not None:
+        return None
+    try:
+        proc.stdin.write(b'go\n')
+        proc.stdin.close()
+    except OSError:
+        proc.kill()
+        return None
+    return proc
+
+def _safe_filename(value):
+    """Make a style/size usable in a file name (e.g. "6/7" -> "6_7")"""
+    return str(value).replace('/', '_').replace('\\', '_')
+
+def _reference_target_size(image_width, image_height):
+    """Resolution the reference image must have to line up with database keypoints"""
+    # NATIVE CAMERA RESOLUTION - hardcode for MindVision camera
+    NATIVE_WIDTH = 5472
+    NATIVE_HEIGHT = 2752
+    
+    # Use database values if they look correct, otherwise use native resolution
+    target_w = image_width if image_width and image_width > 1920 else NATIVE_WIDTH
+    target_h = image_height if image_height and image_height > 1080 else NATIVE_HEIGHT
+    
+    # BUGFIX: Detect if only width was scaled but not height (admin dashboard bug)
+    if target_w == NATIVE_WIDTH and target_h == 1080:
+        print(f"[BUGFIX] Detected incomplete scaling in database ({NATIVE_WIDTH}x1080)")
+        print(f"[BUGFIX] Correcting target height from 1080 to {NATIVE_HEIGHT}")
+        target_h = NATIVE_HEIGHT
+    
+    return target_w, target_h
+
+def _probe_image_size(path):
+    """(width, height) from the JPEG SOF or PNG IHDR header without decoding; PIL for other formats"""
+    with open(path, 'rb') as f:
+        head = f.read(24)
+        if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+            return struct.unpack('>II', head[16:24])
+        
+        if head[:2] == b'\xff\xd8':
+            # Walk the JPEG segments until the start-of-frame marker
+            f.seek(2)
+            while True:
+                segment = f.read(4)
+                if len(segment) < 4 or segment[0] != 0xFF:
+                    break
+                marker = segment[1]
+                if marker == 0xFF:
+                    f.seek(-3, os.SEEK_CUR)  # Fill byte, re-sync on the next one
+                    continue
+                length = struct.unpack('>H', segment[2:4])[0]
+                if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                    frame = f.read(5)  # precision, height, width
+                    if len(frame) < 5:
+                        break
+                    height, width = struct.unpack('>HH', frame[1:5])
+                    return width, height
+                if length < 2:
+                    break
+                f.seek(length - 2, os.SEEK_CUR)
+    
+    with Image.open(path) as img:
+        return img.size
+
+def _write_reference_image(image_data, mime, base_name, upscale_to=None):
+    """Decode a Base64 reference image into TEMP_ANNOTATIONS_DIR and return its path.
+    
+    With upscale_to=(w, h), a smaller image is upscaled to that size before it is kept.
+    """
+    ext = EXT_MAP.get(mime, '.jpg')
+    image_path = os.path.join(TEMP_ANNOTATIONS_DIR, f"{base_name}{ext}")
+    
+    # Decode Base64 image data straight to disk
+    image_size = _decode_base64_to_file(image_data, image_path)
+    
+    if upscale_to:
+        target_w, target_h = upscale_to
+        # Read dimensions from the file header; only decode if we actually have to upscale
+        try:
+            actual_w, actual_h = _probe_image_size(image_path)
+        except Exception as e:
+            print(f"[WARN] Could not read reference image size: {e}")
+            actual_w = actual_h = None
+        
+        if actual_w is not None:
+            print(f"[DB] Reference image actual size: {actual_w}x{actual_h}")
+            print(f"[DB] Target size (native camera): {target_w}x{target_h}")
+            
+            # If image is smaller than target (webcam image with scaled keypoints)
+            if actual_w < target_w or actual_h < target_h:
+                img = cv2.imread(image_path, cv2.IMREAD_COLOR)
+                if img is None:
+                    print(f"[WARN] Could not decode reference image, keeping it as uploaded")
+                else:
+                    print(f"[DB] UPSCALING reference image from {actual_w}x{actual_h} to {target_w}x{target_h}")
+                    # Bicubic is plenty for keypoint alignment and far cheaper than LANCZOS4
+                    img_upscaled = _upscale_image(img, target_w, target_h)
+                    
+                    # Verify upscale worked
+                    upscaled_h, upscaled_w = img_upscaled.shape[:2]
+                    print(f"[DB] Upscaled result: {upscaled_w}x{upscaled_h}")
+                    
+                    # Encode and write in one call
+                    if ext in ('.jpg', '.jpeg'):
+                        cv2.imwrite(image_path, img_upscaled, [cv2.IMWRITE_JPEG_QUALITY, 95])
+                    else:
+                        cv2.imwrite(image_path, img_upscaled)
+                    
+                    image_size = os.path.getsize(image_path)
+                    print(f"[DB] Upscaled image size: {image_size} bytes")
+            else:
+                print(f"[DB] Image already at target resolution, no upscale needed")
+    
+    print(f"[DB] Wrote reference image to: {image_path} ({image_size} bytes)")
+    return image_path
+
+def _parse_db_keypoints(keypoints_pixels, target_distances, placement_box):
+    """Parse database keypoints ([[x, y], ...]), target distances ({"1": 3.81, ...}) and placement box ([x1, y1, x2, y2]).
+    
+    Each field may arrive as a JSON string or already decoded.
+    """
+    if isinstance(keypoints_pixels, str):
+        keypoints = _json_loads(keypoints_pixels)
+    else:
+        keypoints = keypoints_pixels or []
+    
+    if isinstance(target_distances, str):
+        targets = _json_loads(target_distances) if target_distances else {}
+    else:
+        targets = target_distances or {}
+    
+    if isinstance(placement_box, str):
+        box = _json_loads(placement_box) if placement_box else []
+    else:
+        box = placement_box or []
+    
+    return keypoints, targets, box
+
+def _build_anno_json(keypoints, targets, box, style, size, source, dst, **extra):
+    """Write a measurement-compatible annotation file built from database data"""
+    measurement_annotation = {
+        'keypoints': keypoints,
+        'target_distances': targets,
+        'placement_box': box,
+        'annotation_date': datetime.now().isoformat(),
+        'source': source,
+        'article_style': style,
+        'size': size,
+        **extra
+    }
+    _write_json_file(dst, measurement_annotation)
 
 def ensure_directories():
     """Ensure all required directories exist"""
+    os.makedirs(LOCAL_STORAGE_PATH, exist_ok=True)
     os.makedirs(RESULTS_PATH, exist_ok=True)
-    print(f"[OK] Annotations directory (Laravel): {ANNOTATIONS_PATH}")
-    print(f"[OK] Results directory: {RESULTS_PATH}")
+    os.makedirs(LOCAL_ANNOTATIONS_PATH, exist_ok=True)
+    os.makedirs(TEMP_ANNOTATIONS_DIR, exist_ok=True)
+
+# Created once at import so request handlers can assume they exist
+ensure_directories()
+
+@functools.lru_cache(maxsize=256)
+def _resolve_anno_paths(article_style, annotation_name, side, mtime_tag):
+    """Find (annotation_json_path, reference_image_path) in annotation storage.
+    
+    mtime_tag carries the storage directory mtimes so the cache follows file changes.
+    Raises FileNotFoundError when nothing matches, which keeps misses out of the cache.
+    """
+    annotation_json_path = None
+    reference_image_path = None
+    
+    # PRIORITY 3: File-based annotation lookup (fallback) - check multiple locations
+    # Build annotation file paths using naming convention: {article_style}_{size}_{side}
+    # Or fallback to: {article_style}_{size} (same annotation for both sides)
+    if article_style:
+        # Sanitize article_style for filename
+        safe_style = _safe_filename(article_style)
+        safe_name = _safe_filename(annotation_name)
+
+        # Try side-specific file first: {article_style}_{size}_{side}.json
+        base_name_with_side = f"{safe_style}_{safe_name}_{side}"
+        # Then fallback to generic: {article_style}_{size}.json
+        base_name_generic = f"{safe_style}_{safe_name}"
+
+        # Check multiple directories: Laravel storage AND local temp_annotations
+        search_dirs = [ANNOTATIONS_PATH, LOCAL_ANNOTATIONS_PATH]
+
+        # Try side-specific files first
+        for search_dir in search_dirs:
+            json_file = os.path.join(search_dir, f"{base_name_with_side}.json")
+
+            if os.path.exists(json_file):
+                annotation_json_path = json_file
+
+                # Check for image with various extensions
+                reference_image_path = _find_reference_image(search_dir, base_name_with_side)
+
+                print(f"[ANNOTATION] Found side-specific annotation ({side}): {json_file}")
+                if reference_image_path:
+                    print(f"[ANNOTATION] Found side-specific reference image: {reference_image_path}")
+                break
+
+        # If no side-specific file, try generic file (use same for front and back)
+        if not annotation_json_path:
+            for search_dir in search_dirs:
+                json_file = os.path.join(search_dir, f"{base_name_generic}.json")
+
+                if os.path.exists(json_file):
+                    annotation_json_path = json_file
+
+                    # Check for image with various extensions
+                    reference_image_path = _find_reference_image(search_dir, base_name_generic)
+
+                    print(f"[ANNOTATION] Found generic annotation (for {side}): {json_file}")
+                    if reference_image_path:
+                        print(f"[ANNOTATION] Found generic reference image: {reference_image_path}")
+                    break
+    
+    # Fallback: Try size-only naming (backward compatible)
+    if not annotation_json_path:
+        base_name = annotation_name
+
+        for search_dir in [ANNOTATIONS_PATH, LOCAL_ANNOTATIONS_PATH]:
+            json_file = os.path.join(search_dir, f"{base_name}.json")
+
+            if os.path.exists(json_file):
+                annotation_json_path = json_file
+                # Check for image with various extensions
+                reference_image_path = _find_reference_image(search_dir, base_name)
+                print(f"[ANNOTATION] Using size-only annotation: {json_file}")
+                break
+
+    # Also check folder-based structure as additional fallback
+    if not annotation_json_path:
+        # Try folder structure: annotations/{article_style}/{size}/{side}_annotation.json
+        if article_style:
+            folder_path = os.path.join(ANNOTATIONS_PATH, article_style, annotation_name)
+            folder_json = os.path.join(folder_path, f'{side}_annotation.json')
+            folder_image = os.path.join(folder_path, f'{side}_reference.jpg')
+
+            if os.path.exists(folder_json):
+                annotation_json_path = folder_json
+                if os.path.exists(folder_image):
+                    reference_image_path = folder_image
+                print(f"[ANNOTATION] Using folder-based annotation ({side}): {folder_json}")
+
+        # Try size-only folder
+        if not annotation_json_path:
+            folder_path = os.path.join(ANNOTATIONS_PATH, annotation_name)
+            folder_json = os.path.join(folder_path, f'{side}_annotation.json')
+            folder_image = os.path.join(folder_path, f'{side}_reference.jpg')
+
+            if os.path.exists(folder_json):
+                annotation_json_path = folder_json
+                if os.path.exists(folder_image):
+                    reference_image_path = folder_image
+                print(f"[ANNOTATION] Using size folder annotation ({side}): {folder_json}")
+    
+    if not annotation_json_path:
+        raise FileNotFoundError(f"{article_style}_{annotation_name}")
+    return annotation_json_path, reference_image_path
+
+def _lookup_annotation_files(article_style, annotation_name, side):
+    """Cached annotation file lookup; returns (annotation_json_path, reference_image_path)"""
+    mtime_tag = []
+    for path in (ANNOTATIONS_PATH, LOCAL_ANNOTATIONS_PATH):
+        try:
+            mtime_tag.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            mtime_tag.append(None)
+    
+    paths = _resolve_anno_paths(article_style, annotation_name, side, tuple(mtime_tag))
+    # Folder-format edits don't touch the top-level mtimes, so confirm a cached hit still exists
+    if not os.path.exists(paths[0]):
+        _resolve_anno_paths.cache_clear()
+        paths = _resolve_anno_paths(article_style, annotation_name, side, tuple(mtime_tag))
+    return paths
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
+    response = jsonify({
         'status': 'ok',
         'message': 'Python Measurement API is running',
         'timestamp': time.time()
     })
+    response.headers['Cache-Control'] = 'max-age=1'
+    return response
 
 @app.route('/api/measurement/status', methods=['GET'])
 def get_measurement_status():
     """Get current measurement status"""
-    return jsonify({
+    data, rev = _measurement_snapshot()
+    etag = f'{os.getpid()}-{rev}'  # pid keeps ETags from a previous server run from matching
+    if request.if_none_match.contains(etag):
+        return _not_modified(etag)
+    
+    response = jsonify({
         'status': 'success',
-        'data': measurement_status
+        'data': data
     })
+    response.set_etag(etag)
+    return response
+
+def _scan_annotations():
+    """Scan Laravel storage for file-format and folder-format annotations"""
+    annotations = []
+    # One directory scan; sibling lookups below are set membership, not stat calls
+    try:
+        with os.scandir(ANNOTATIONS_PATH) as it:
+            entries = list(it)
+    except FileNotFoundError:
+        entries = []
+    if entries:
+        names = {entry.name for entry in entries}
+        
+        for entry in entries:
+            item = entry.name
+            
+            # Check if it's a JSON file (new format: {article_style}_{size}.json)
+            if item.endswith('.json'):
+                # Parse article_style and size from filename
+                base_name = item[:-5]  # Remove .json
+                parts = base_name.rsplit('_', 1)  # Split on last underscore
+                
+                if len(parts) == 2:
+                    article_style, size = parts
+                else:
+                    article_style = base_name
+                    size = 'unknown'
+                
+                # Check for matching image, keeping the extension for later lookups
+                image_ext = next((ext for ext in IMAGE_EXTS if f"{base_name}{ext}" in names), None)
+                
+                annotation_info = {
+                    'name': base_name,
+                    'article_style': article_style,
+                    'size': size,
+                    'format': 'file',
+                    'has_annotation': True,
+                    'has_image': image_ext is not None,
+                    'image_ext': image_ext
+                }
+                annotations.append(annotation_info)
+            
+            # Check if it's a folder (old format)
+            elif entry.is_dir(follow_symlinks=False):
+                with os.scandir(entry.path) as sub:
+                    children = {child.name for child in sub}
+                annotation_info = {
+                    'name': item,
+                    'article_style': None,
+                    'size': item,  # Folder name is typically the size
+                    'format': 'folder',
+                    'has_front': 'front_annotation.json' in children,
+                    'has_back': 'back_annotation.json' in children,
+                    'has_front_image': 'front_reference.jpg' in children,
+                    'has_back_image': 'back_reference.jpg' in children
+                }
+                annotations.append(annotation_info)
+    
+    return annotations
+
+def _list_annotations_cached():
+    """Return (annotations, etag), rescanning only when storage changed or the cache went stale"""
+    try:
+        mtime = os.stat(ANNOTATIONS_PATH).st_mtime_ns
+    except OSError:
+        mtime = None
+    
+    now = time.monotonic()
+    if (_anno_cache['payload'] is not None and _anno_cache['mtime'] == mtime
+            and now - _anno_cache['built_at'] < ANNOTATION_CACHE_TTL):
+        return _anno_cache['payload'], _anno_cache['etag']
+    
+    annotations = _scan_annotations()
+    # Hash the listing itself: folder-format changes don't touch the top-level mtime
+    etag = hashlib.blake2b(_json_dumps(annotations, sort_keys=True), digest_size=8).hexdigest()
+    index = {info['name']: info for info in annotations if info['format'] == 'file'}
+    _anno_cache.update(mtime=mtime, built_at=now, payload=annotations, etag=etag, index=index)
+    return annotations, etag
+
+def _find_reference_image(search_dir, base_name):
+    """Path of the image stored next to {base_name}.json, or None"""
+    if search_dir == ANNOTATIONS_PATH:
+        # Laravel storage is already indexed by the annotation listing
+        _list_annotations_cached()
+        info = _anno_cache['index'].get(base_name)
+        if info is not None:
+            return os.path.join(search_dir, f"{base_name}{info['image_ext']}") if info['image_ext'] else None
+    
+    for ext in IMAGE_EXTS:
+        potential_image = os.path.join(search_dir, f"{base_name}{ext}")
+        if os.path.exists(potential_image):
+            return potential_image
+    return None
+
+def _invalidate_annotation_cache():
+    """Force the next annotation listing to rescan storage"""
+    _anno_cache['mtime'] = 0
+    _anno_cache['payload'] = None
 
 @app.route('/api/annotations/list', methods=['GET'])
 def list_annotations():
     """List all available annotations in Laravel storage - supports both file and folder formats"""
     try:
-        annotations = []
-        if os.path.exists(ANNOTATIONS_PATH):
-            for item in os.listdir(ANNOTATIONS_PATH):
-                item_path = os.path.join(ANNOTATIONS_PATH, item)
-                
-                # Check if it's a JSON file (new format: {article_style}_{size}.json)
-                if item.endswith('.json'):
-                    # Parse article_style and size from filename
-                    base_name = item[:-5]  # Remove .json
-                    parts = base_name.rsplit('_', 1)  # Split on last underscore
-                    
-                    if len(parts) == 2:
-                        article_style, size = parts
-                    else:
-                        article_style = base_name
-                        size = 'unknown'
-                    
-                    # Check for matching image
-                    has_image = False
-                    for ext in ['.jpg', '.jpeg', '.png', '.bmp']:
-                        if os.path.exists(os.path.join(ANNOTATIONS_PATH, f"{base_name}{ext}")):
-                            has_image = True
-                            break
-                    
-                    annotation_info = {
-                        'name': base_name,
-                        'article_style': article_style,
-                        'size': size,
-                        'format': 'file',
-                        'has_annotation': True,
-                        'has_image': has_image
-                    }
-                    annotations.append(annotation_info)
-                
-                # Check if it's a folder (old format)
-                elif os.path.isdir(item_path):
-                    annotation_info = {
-                        'name': item,
-                        'article_style': None,
-                        'size': item,  # Folder name is typically the size
-                        'format': 'folder',
-                        'has_front': os.path.exists(os.path.join(item_path, 'front_annotation.json')),
-                        'has_back': os.path.exists(os.path.join(item_path, 'back_annotation.json')),
-                        'has_front_image': os.path.exists(os.path.join(item_path, 'front_reference.jpg')),
-                        'has_back_image': os.path.exists(os.path.join(item_path, 'back_reference.jpg'))
-                    }
-                    annotations.append(annotation_info)
+        annotations, etag = _list_annotations_cached()
+        if request.if_none_match.contains(etag):
+            return _not_modified(etag)
         
-        return jsonify({
+        response = jsonify({
             'status': 'success',
             'data': {
                 'annotations': annotations,
@@ -133,11 +848,19 @@ def list_annotations():
                 'path': ANNOTATIONS_PATH
             }
         })
+        response.set_etag(etag)
+        return response
     except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'message': str(e)
-        }), 500
+        return _err(str(e))
+
+@app.route('/api/annotations/cache/clear', methods=['POST'])
+def clear_annotation_cache():
+    """Drop the cached annotation listing so the next list call rescans storage"""
+    _invalidate_annotation_cache()
+    return jsonify({
+        'status': 'success',
+        'message': 'Annotation cache cleared'
+    })
 
 @app.route('/api/annotations/export', methods=['POST'])
 def export_annotation():
@@ -148,25 +871,18 @@ def export_annotation():
         target_name = data.get('target_name', source_name)
         
         if not source_name:
-            return jsonify({
-                'status': 'error',
-                'message': 'annotation_name is required'
-            }), 400
+            return _err('annotation_name is required', 400)
         
         # Source: Python annotations folder
         source_dir = os.path.join('annotations', source_name)
         if not os.path.exists(source_dir):
-            return jsonify({
-                'status': 'error',
-                'message': f'Annotation {source_name} not found in Python annotations'
-            }), 404
+            return _err(f'Annotation {source_name} not found in Python annotations', 404)
         
         # Target: Laravel storage
         target_dir = os.path.join(ANNOTATIONS_PATH, target_name)
         os.makedirs(target_dir, exist_ok=True)
         
         # Copy files
-        import shutil
         copied_files = []
         
         files_to_copy = [
@@ -178,10 +894,16 @@ def export_annotation():
         
         for file_name in files_to_copy:
             source_file = os.path.join(source_dir, file_name)
-            if os.path.exists(source_file):
-                target_file = os.path.join(target_dir, file_name)
-                shutil.copy2(source_file, target_file)
-                copied_files.append(file_name)
+            target_file = os.path.join(target_dir, file_name)
+            try:
+                # Content only - copyfile uses the OS fast path (sendfile / CopyFile2), no metadata calls
+                shutil.copyfile(source_file, target_file)
+            except FileNotFoundError:
+                continue
+            copied_files.append(file_name)
+        
+        if copied_files:
+            _invalidate_annotation_cache()
         
         return jsonify({
             'status': 'success',
@@ -194,15 +916,12 @@ def export_annotation():
         })
     
     except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'message': str(e)
-        }), 500
+        return _err(str(e))
 
 @app.route('/api/measurement/start', methods=['POST'])
 def start_measurement():
     """Start measurement with specified annotation"""
-    global measurement_process, measurement_status
+    global _measurement_run, _worker_exited
     
     try:
         data = request.json
@@ -232,24 +951,16 @@ def start_measurement():
         print(f"[API] image_data present: {image_data is not None}, length: {len(image_data) if image_data else 0}")
         
         if not annotation_name:
-            return jsonify({
-                'status': 'error',
-                'message': 'annotation_name (size) is required'
-            }), 400
+            return _err('annotation_name (size) is required', 400)
         
         # Stop any existing measurement before starting a new one
-        if measurement_status['running']:
+        with _status_lock:
+            already_running = measurement_status.running
+        if already_running:
             print(f"[API] Stopping existing measurement before starting new one...")
-            if measurement_process:
-                try:
-                    parent = psutil.Process(measurement_process.pid)
-                    for child in parent.children(recursive=True):
-                        child.kill()
-                    parent.kill()
-                except Exception as e:
-                    print(f"[WARN] Error stopping existing process: {e}")
-            measurement_status['running'] = False
-            time.sleep(0.5)  # Brief delay to allow process cleanup
+            # Returns once the old worker has exited (or its tree was killed)
+            _stop_measurement_process()
+            _set_measurement_status(running=False)
         
         annotation_json_path = None
         reference_image_path = None
@@ -258,225 +969,96 @@ def start_measurement():
         if keypoints_pixels and image_data:
             print(f"[DB] Using measurement-ready keypoints_pixels for {article_style}_{annotation_name}")
             
-            # Create temp directory for database-sourced files
-            temp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp_annotations')
-            os.makedirs(temp_dir, exist_ok=True)
+            # Sanitize filenames to prevent directory issues (e.g. "6/7" -> "6_7")
+            base_name = f"{_safe_filename(article_style)}_{_safe_filename(annotation_name)}"
+            temp_json_path = os.path.join(TEMP_ANNOTATIONS_DIR, f"{base_name}.json")
+            
+            # CRITICAL: Keypoints are stored at native camera resolution (5472x2752)
+            # but the reference image from the webcam may be 1920x1080
+            upscale_to = _reference_target_size(image_width, image_height)
             
-            # First, decode and write Base64 image to temp file
+            # The image pipeline (decode/upscale/encode/write) and JSON parsing are independent
+            image_future = _PREP_POOL.submit(_write_reference_image, image_data, image_mime_type, base_name, upscale_to)
             try:
-                # Determine file extension from MIME type
-                ext_map = {
-                    'image/jpeg': '.jpg',
-                    'image/jpg': '.jpg',
-                    'image/png': '.png',
-                    'image/bmp': '.bmp',
-                    'image/gif': '.gif'
-                }
-                ext = ext_map.get(image_mime_type, '.jpg')
-                
-                # Sanitize filenames to prevent directory issues (e.g. "6/7" -> "6_7")
-                safe_style = str(article_style).replace('/', '_').replace('\\', '_')
-                safe_name = str(annotation_name).replace('/', '_').replace('\\', '_')
-                temp_image_path = os.path.join(temp_dir, f"{safe_style}_{safe_name}{ext}")
-                
-                # Decode Base64 image data
-                image_bytes = base64.b64decode(image_data)
-                
-                # CRITICAL: Check if image needs to be upscaled to match keypoints
-                # Keypoints are now stored at native camera resolution (5472x2752)
-                # but reference image from webcam is 1920x1080
-                import cv2
-                import numpy as np
-                
-                # Decode image to check dimensions
-                nparr = np.frombuffer(image_bytes, np.uint8)
-                img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                
-                if img is not None:
-                    actual_h, actual_w = img.shape[:2]
-                    
-                    # NATIVE CAMERA RESOLUTION - hardcode for MindVision camera
-                    NATIVE_WIDTH = 5472
-                    NATIVE_HEIGHT = 2752
-                    
-                    # Use database values if they look correct, otherwise use native resolution
-                    target_w = image_width if image_width and image_width > 1920 else NATIVE_WIDTH
-                    target_h = image_height if image_height and image_height > 1080 else NATIVE_HEIGHT
-                    
-                    # BUGFIX: Detect if only width was scaled but not height (admin dashboard bug)
-                    if target_w == NATIVE_WIDTH and target_h == 1080:
-                        print(f"[BUGFIX] Detected incomplete scaling in database ({NATIVE_WIDTH}x1080)")
-                        print(f"[BUGFIX] Correcting target height from 1080 to {NATIVE_HEIGHT}")
-                        target_h = NATIVE_HEIGHT
-                    
-                    print(f"[DB] Reference image actual size: {actual_w}x{actual_h}")
-                    print(f"[DB] Target size (native camera): {target_w}x{target_h}")
-                    
-                    # If image is smaller than target (webcam image with scaled keypoints)
-                    if actual_w < target_w or actual_h < target_h:
-                        print(f"[DB] UPSCALING reference image from {actual_w}x{actual_h} to {target_w}x{target_h}")
-                        # Upscale using high-quality interpolation
-                        img_upscaled = cv2.resize(img, (target_w, target_h), interpolation=cv2.INTER_LANCZOS4)
-                        
-                        # Verify upscale worked
-                        upscaled_h, upscaled_w = img_upscaled.shape[:2]
-                        print(f"[DB] Upscaled result: {upscaled_w}x{upscaled_h}")
-                        
-                        # Re-encode to bytes
-                        if ext in ['.jpg', '.jpeg']:
-                            _, img_encoded = cv2.imencode('.jpg', img_upscaled, [cv2.IMWRITE_JPEG_QUALITY, 95])
-                        else:
-                            _, img_encoded = cv2.imencode(ext, img_upscaled)
-                        
-                        image_bytes = img_encoded.tobytes()
-                        print(f"[DB] Upscaled image size: {len(image_bytes)} bytes")
-                    else:
-                        print(f"[DB] Image already at target resolution, no upscale needed")
-                
-                with open(temp_image_path, 'wb') as f:
-                    f.write(image_bytes)
-                reference_image_path = temp_image_path
-                print(f"[DB] Wrote reference image to: {temp_image_path} ({len(image_bytes)} bytes)")
-                
+                annotation_result = _parse_db_keypoints(keypoints_pixels, target_distances, placement_box)
+            except Exception as e:
+                annotation_result = e
+            try:
+                image_result = image_future.result()
             except Exception as e:
-                print(f"[ERR] Failed to decode/write image: {e}")
-                return jsonify({
-                    'status': 'error',
-                    'message': f'Failed to process image data: {str(e)}'
-                }), 400
+                image_result = e
+            
+            if isinstance(image_result, Exception):
+                print(f"[ERR] Failed to decode/write image: {image_result}")
+                return _err(f'Failed to process image data: {str(image_result)}', 400)
+            reference_image_path = image_result
             
             # Build measurement annotation from database data
-            temp_json_path = os.path.join(temp_dir, f"{safe_style}_{safe_name}.json")
             try:
-                # Parse keypoints_pixels (already in correct format [[x, y], ...])
-                if isinstance(keypoints_pixels, str):
-                    keypoints = json.loads(keypoints_pixels)
-                else:
-                    keypoints = keypoints_pixels or []
-                
-                # Parse target_distances (already in correct format {"1": 3.81, ...})
-                if isinstance(target_distances, str):
-                    targets = json.loads(target_distances) if target_distances else {}
-                else:
-                    targets = target_distances or {}
-                
-                # Parse placement_box (already in correct format [x1, y1, x2, y2])
-                if isinstance(placement_box, str):
-                    box = json.loads(placement_box) if placement_box else []
-                else:
-                    box = placement_box or []
+                if isinstance(annotation_result, Exception):
+                    raise annotation_result
+                keypoints, targets, box = annotation_result
                 
                 print(f"[DB] Loaded {len(keypoints)} keypoints (pixels)")
                 print(f"[DB] Loaded {len(targets)} target distances")
                 print(f"[DB] Placement box: {box}")
                 
-                # Create measurement-compatible annotation structure
-                measurement_annotation = {
-                    'keypoints': keypoints,
-                    'target_distances': targets,
-                    'placement_box': box,
-                    'annotation_date': datetime.now().isoformat(),
-                    'source': 'database',
-                    'article_style': article_style,
-                    'size': annotation_name
-                }
-                
-                with open(temp_json_path, 'w') as f:
-                    json.dump(measurement_annotation, f, indent=4)
+                _build_anno_json(keypoints, targets, box,
+                                 article_style, annotation_name, 'database', temp_json_path)
                 annotation_json_path = temp_json_path
                 print(f"[DB] Wrote annotation JSON to: {temp_json_path}")
                 
             except Exception as e:
                 print(f"[ERR] Failed to process annotation data: {e}")
-                import traceback
                 traceback.print_exc()
-                return jsonify({
-                    'status': 'error',
-                    'message': f'Failed to process annotation data: {str(e)}'
-                }), 400
+                return _err(f'Failed to process annotation data: {str(e)}', 400)
         
         # PRIORITY 2: Fallback - use percentage annotations and convert
         elif annotation_data and image_data:
             print(f"[DB] Using percentage annotations (fallback) for {article_style}_{annotation_name}")
             
-            # Create temp directory
-            temp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp_annotations')
-            os.makedirs(temp_dir, exist_ok=True)
-            
             try:
-                # Decode image to get dimensions
-                ext_map = {
-                    'image/jpeg': '.jpg',
-                    'image/jpg': '.jpg',
-                    'image/png': '.png',
-                    'image/bmp': '.bmp',
-                    'image/gif': '.gif'
-                }
-                ext = ext_map.get(image_mime_type, '.jpg')
-                temp_image_path = os.path.join(temp_dir, f"{article_style}_{annotation_name}{ext}")
-                
-                image_bytes = base64.b64decode(image_data)
-                with open(temp_image_path, 'wb') as f:
-                    f.write(image_bytes)
-                reference_image_path = temp_image_path
+                base_name = f"{_safe_filename(article_style)}_{_safe_filename(annotation_name)}"
+                reference_image_path = _write_reference_image(image_data, image_mime_type, base_name)
                 
-                # Get image dimensions for coordinate conversion
-                img = Image.open(io.BytesIO(image_bytes))
-                img_width, img_height = img.size
+                # Get image dimensions for coordinate conversion from the file header
+                img_width, img_height = _probe_image_size(reference_image_path)
                 print(f"[DB] Reference image dimensions: {img_width}x{img_height}")
                 
                 # Parse and convert percentage annotations
                 if isinstance(annotation_data, str):
-                    db_annotations = json.loads(annotation_data)
+                    db_annotations = _json_loads(annotation_data)
                 else:
                     db_annotations = annotation_data
                 
-                # Transform [{x, y, label}] to [[x, y], ...]
-                keypoints = []
-                for point in db_annotations:
-                    x_percent = float(point.get('x', 0))
-                    y_percent = float(point.get('y', 0))
-                    x_pixel = int((x_percent / 100.0) * img_width)
-                    y_pixel = int((y_percent / 100.0) * img_height)
-                    keypoints.append([x_pixel, y_pixel])
-                    print(f"[DB] Point '{point.get('label', 'unknown')}': ({x_percent}%, {y_percent}%) -> ({x_pixel}, {y_pixel}) px")
+                # Transform [{x, y, label}] to [[x, y], ...] in one vectorized pass
+                percents = np.array([[float(point.get('x', 0)), float(point.get('y', 0))] for point in db_annotations],
+                                    dtype=np.float64).reshape(-1, 2)
+                pixels = (percents / 100.0 * np.array([img_width, img_height])).astype(np.int32)
+                keypoints = pixels.tolist()
+                print(f"[DB] Converted {len(keypoints)} percentage points to pixels")
+                if DEBUG_POINTS:
+                    for point, (x_pct, y_pct), (x_pixel, y_pixel) in zip(db_annotations, percents, keypoints):
+                        print(f"[DB] Point '{point.get('label', 'unknown')}': ({x_pct}%, {y_pct}%) -> ({x_pixel}, {y_pixel}) px")
                 
                 # Create annotation file
-                temp_json_path = os.path.join(temp_dir, f"{article_style}_{annotation_name}.json")
-                measurement_annotation = {
-                    'keypoints': keypoints,
-                    'target_distances': {},
-                    'placement_box': [],
-                    'annotation_date': datetime.now().isoformat(),
-                    'source': 'database_converted',
-                    'article_style': article_style,
-                    'size': annotation_name
-                }
-                
-                with open(temp_json_path, 'w') as f:
-                    json.dump(measurement_annotation, f, indent=4)
+                temp_json_path = os.path.join(TEMP_ANNOTATIONS_DIR, f"{base_name}.json")
+                _build_anno_json(keypoints, {}, [], article_style, annotation_name, 'database_converted', temp_json_path)
                 annotation_json_path = temp_json_path
                 print(f"[DB] Wrote converted annotation JSON to: {temp_json_path}")
                 
             except Exception as e:
                 print(f"[ERR] Failed to convert annotation data: {e}")
-                import traceback
                 traceback.print_exc()
-                return jsonify({
-                    'status': 'error',
-                    'message': f'Failed to process annotation data: {str(e)}'
-                }), 400
+                return _err(f'Failed to process annotation data: {str(e)}', 400)
         
         # PRIORITY 2.5: Use keypoints from database but find image from local files
         elif keypoints_pixels and not image_data:
             print(f"[DB+FILE] Using keypoints from database + image from file for {article_style}_{annotation_name} ({side})")
             
             # First find the reference image from local files
-            temp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp_annotations')
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            safe_style = str(article_style).replace('/', '_').replace('\\', '_')
-            safe_name = str(annotation_name).replace('/', '_').replace('\\', '_')
+            safe_style = _safe_filename(article_style)
+            safe_name = _safe_filename(annotation_name)
             
             # Try to find reference image - first side-specific, then generic
             search_dirs = [ANNOTATIONS_PATH, LOCAL_ANNOTATIONS_PATH]
@@ -484,26 +1066,14 @@ def start_measurement():
             
             # Try side-specific: {article_style}_{size}_{side}.jpg
             for search_dir in search_dirs:
-                if not os.path.exists(search_dir):
-                    continue
-                for ext in ['.jpg', '.jpeg', '.png', '.bmp']:
-                    potential_image = os.path.join(search_dir, f"{safe_style}_{safe_name}_{side}{ext}")
-                    if os.path.exists(potential_image):
-                        found_image_path = potential_image
-                        break
+                found_image_path = _find_reference_image(search_dir, f"{safe_style}_{safe_name}_{side}")
                 if found_image_path:
                     break
             
             # Try generic: {article_style}_{size}.jpg
             if not found_image_path:
                 for search_dir in search_dirs:
-                    if not os.path.exists(search_dir):
-                        continue
-                    for ext in ['.jpg', '.jpeg', '.png', '.bmp']:
-                        potential_image = os.path.join(search_dir, f"{safe_style}_{safe_name}{ext}")
-                        if os.path.exists(potential_image):
-                            found_image_path = potential_image
-                            break
+                    found_image_path = _find_reference_image(search_dir, f"{safe_style}_{safe_name}")
                     if found_image_path:
                         break
             
@@ -513,162 +1083,35 @@ def start_measurement():
                 
                 # Build annotation JSON from database keypoints
                 try:
-                    if isinstance(keypoints_pixels, str):
-                        keypoints = json.loads(keypoints_pixels)
-                    else:
-                        keypoints = keypoints_pixels or []
-                    
-                    if isinstance(target_distances, str):
-                        targets = json.loads(target_distances) if target_distances else {}
-                    else:
-                        targets = target_distances or {}
-                    
-                    if isinstance(placement_box, str):
-                        box = json.loads(placement_box) if placement_box else []
-                    else:
-                        box = placement_box or []
+                    keypoints, targets, box = _parse_db_keypoints(keypoints_pixels, target_distances, placement_box)
                     
                     print(f"[DB+FILE] Loaded {len(keypoints)} keypoints from database")
                     
                     # Write annotation JSON to temp file
-                    temp_json_path = os.path.join(temp_dir, f"{safe_style}_{safe_name}_{side}.json")
-                    measurement_annotation = {
-                        'keypoints': keypoints,
-                        'target_distances': targets,
-                        'placement_box': box,
-                        'annotation_date': datetime.now().isoformat(),
-                        'source': 'database_with_local_image',
-                        'article_style': article_style,
-                        'size': annotation_name,
-                        'side': side
-                    }
-                    
-                    with open(temp_json_path, 'w') as f:
-                        json.dump(measurement_annotation, f, indent=4)
+                    temp_json_path = os.path.join(TEMP_ANNOTATIONS_DIR, f"{safe_style}_{safe_name}_{side}.json")
+                    _build_anno_json(keypoints, targets, box, article_style, annotation_name,
+                                     'database_with_local_image', temp_json_path, side=side)
                     annotation_json_path = temp_json_path
                     print(f"[DB+FILE] Wrote annotation JSON to: {temp_json_path}")
                     
                 except Exception as e:
                     print(f"[ERR] Failed to process database keypoints: {e}")
-                    import traceback
                     traceback.print_exc()
             else:
                 print(f"[DB+FILE] No local reference image found, falling back to file-based lookup")
         
         # PRIORITY 3: File-based annotation lookup (fallback) - check multiple locations
         if not annotation_json_path:
-            # Build annotation file paths using naming convention: {article_style}_{size}_{side}
-            # Or fallback to: {article_style}_{size} (same annotation for both sides)
-            if article_style:
-                # Sanitize article_style for filename
-                safe_style = str(article_style).replace('/', '_').replace('\\', '_')
-                safe_name = str(annotation_name).replace('/', '_').replace('\\', '_')
-                
-                # Try side-specific file first: {article_style}_{size}_{side}.json
-                base_name_with_side = f"{safe_style}_{safe_name}_{side}"
-                # Then fallback to generic: {article_style}_{size}.json
-                base_name_generic = f"{safe_style}_{safe_name}"
-                
-                # Check multiple directories: Laravel storage AND local temp_annotations
-                search_dirs = [ANNOTATIONS_PATH, LOCAL_ANNOTATIONS_PATH]
-                
-                # Try side-specific files first
-                for search_dir in search_dirs:
-                    if not os.path.exists(search_dir):
-                        continue
-                        
-                    json_file = os.path.join(search_dir, f"{base_name_with_side}.json")
-                    
-                    if os.path.exists(json_file):
-                        annotation_json_path = json_file
-                        
-                        # Check for image with various extensions
-                        for ext in ['.jpg', '.jpeg', '.png', '.bmp']:
-                            potential_image = os.path.join(search_dir, f"{base_name_with_side}{ext}")
-                            if os.path.exists(potential_image):
-                                reference_image_path = potential_image
-                                break
-                        
-                        print(f"[ANNOTATION] Found side-specific annotation ({side}): {json_file}")
-                        if reference_image_path:
-                            print(f"[ANNOTATION] Found side-specific reference image: {reference_image_path}")
-                        break
-                
-                # If no side-specific file, try generic file (use same for front and back)
-                if not annotation_json_path:
-                    for search_dir in search_dirs:
-                        if not os.path.exists(search_dir):
-                            continue
-                            
-                        json_file = os.path.join(search_dir, f"{base_name_generic}.json")
-                        
-                        if os.path.exists(json_file):
-                            annotation_json_path = json_file
-                            
-                            # Check for image with various extensions
-                            for ext in ['.jpg', '.jpeg', '.png', '.bmp']:
-                                potential_image = os.path.join(search_dir, f"{base_name_generic}{ext}")
-                                if os.path.exists(potential_image):
-                                    reference_image_path = potential_image
-                                    break
-                            
-                            print(f"[ANNOTATION] Found generic annotation (for {side}): {json_file}")
-                            if reference_image_path:
-                                print(f"[ANNOTATION] Found generic reference image: {reference_image_path}")
-                            break
-        
-        # Fallback: Try size-only naming (backward compatible)
-        if not annotation_json_path:
-            base_name = annotation_name
-            
-            for search_dir in [ANNOTATIONS_PATH, LOCAL_ANNOTATIONS_PATH]:
-                if not os.path.exists(search_dir):
-                    continue
-                    
-                json_file = os.path.join(search_dir, f"{base_name}.json")
-                
-                if os.path.exists(json_file):
-                    annotation_json_path = json_file
-                    # Check for image
-                    for ext in ['.jpg', '.jpeg', '.png', '.bmp']:
-                        potential_image = os.path.join(search_dir, f"{base_name}{ext}")
-                        if os.path.exists(potential_image):
-                            reference_image_path = potential_image
-                            break
-                    print(f"[ANNOTATION] Using size-only annotation: {json_file}")
-                    break
-        
-        # Also check folder-based structure as additional fallback
-        if not annotation_json_path:
-            # Try folder structure: annotations/{article_style}/{size}/{side}_annotation.json
-            if article_style:
-                folder_path = os.path.join(ANNOTATIONS_PATH, article_style, annotation_name)
-                folder_json = os.path.join(folder_path, f'{side}_annotation.json')
-                folder_image = os.path.join(folder_path, f'{side}_reference.jpg')
-                
-                if os.path.exists(folder_json):
-                    annotation_json_path = folder_json
-                    if os.path.exists(folder_image):
-                        reference_image_path = folder_image
-                    print(f"[ANNOTATION] Using folder-based annotation ({side}): {folder_json}")
-            
-            # Try size-only folder
-            if not annotation_json_path:
-                folder_path = os.path.join(ANNOTATIONS_PATH, annotation_name)
-                folder_json = os.path.join(folder_path, f'{side}_annotation.json')
-                folder_image = os.path.join(folder_path, f'{side}_reference.jpg')
-                
-                if os.path.exists(folder_json):
-                    annotation_json_path = folder_json
-                    if os.path.exists(folder_image):
-                        reference_image_path = folder_image
-                    print(f"[ANNOTATION] Using size folder annotation ({side}): {folder_json}")
+            try:
+                annotation_json_path, found_image_path = _lookup_annotation_files(
+                    article_style, annotation_name, side)
+                if found_image_path:
+                    reference_image_path = found_image_path
+            except FileNotFoundError:
+                pass
         
         if not annotation_json_path:
-            return jsonify({
-                'status': 'error',
-                'message': f'Annotation not found. No database data provided and no file found for: {article_style}_{annotation_name}'
-            }), 404
+            return _err(f'Annotation not found. No database data provided and no file found for: {article_style}_{annotation_name}', 404)
         
         # Create config file for measurement script
         config = {
@@ -684,67 +1127,69 @@ def start_measurement():
         print(f"[CONFIG] Annotation JSON: {annotation_json_path}")
         print(f"[CONFIG] Reference Image: {reference_image_path}")
         
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=4)
-        
-        # Update status
-        measurement_status = {
-            'running': True,
-            'annotation_name': annotation_name,
-            'status': 'starting',
-            'error': None,
-            'start_time': time.time()
-        }
+        _write_json_file(CONFIG_FILE, config, indent=False)
+        
+        # Update status and claim a new run
+        exited = threading.Event()
+        with _status_lock:
+            _measurement_run += 1
+            run_id = _measurement_run
+            _worker_exited = exited
+        _set_measurement_status(
+            running=True,
+            annotation_name=annotation_name,
+            status='starting',
+            error=None,
+            start_time=time.time()
+        )
         
         # Start measurement in background thread
         def run_measurement():
-            global measurement_process, measurement_status
+            global measurement_process
+            proc = None
             try:
-                # Run the measurement script - OpenCV GUI needs visible window
-                import platform
-                
-                if platform.system() == 'Windows':
-                    # On Windows, use CREATE_NEW_CONSOLE to:
-                    # 1. Show a visible console window for debugging
-                    # 2. Allow OpenCV GUI windows to display
-                    # This makes it easier to see errors and camera output
-                    measurement_process = subprocess.Popen(
-                        ['python', 'measurement_worker.py'],
-                        creationflags=subprocess.CREATE_NEW_CONSOLE,
-                        env={**os.environ, 'PYTHONIOENCODING': 'utf-8'},
-                        cwd=os.path.dirname(os.path.abspath(__file__))
-                    )
-                    print(f"[MEASUREMENT] Started measurement_worker.py with PID: {measurement_process.pid}")
-                    print(f"[MEASUREMENT] A new console window should open showing measurement progress")
+                # Prefer the pre-warmed worker (cv2/numpy/camera SDK already imported)
+                proc = _take_standby_worker()
+                if proc is not None:
+                    print(f"[MEASUREMENT] Handed job to pre-warmed measurement_worker.py (PID: {proc.pid})")
                 else:
-                    # On other platforms, run normally
-                    measurement_process = subprocess.Popen(
-                        ['python', 'measurement_worker.py'],
-                        env={**os.environ, 'PYTHONIOENCODING': 'utf-8'},
-                        cwd=os.path.dirname(os.path.abspath(__file__))
-                    )
+                    proc = _spawn_measurement_worker()
+                    print(f"[MEASUREMENT] Started measurement_worker.py with PID: {proc.pid}")
+                if _IS_WINDOWS:
+                    print(f"[MEASUREMENT] A new console window should open showing measurement progress")
+                with _status_lock:
+                    retired = run_id != _measurement_run
+                    if not retired:
+                        measurement_process = proc
+                if retired:
+                    # Stopped (or superseded) before the worker was published - don't leave it running
+                    proc.terminate()
                 
-                measurement_status['status'] = 'running'
+                # Warm up the worker for the next measurement while this one runs
+                _prewarm_measurement_worker()
+                
+                _set_measurement_status(run_id, status='running')
                 
                 # Wait for completion
-                measurement_process.wait()
+                if _wait_process(proc) is None:
+                    return  # Server shutting down
                 
-                if measurement_process.returncode == 0:
-                    measurement_status['status'] = 'completed'
+                if proc.returncode == 0:
+                    _set_measurement_status(run_id, status='completed')
                 else:
-                    measurement_status['status'] = 'failed'
-                    measurement_status['error'] = f'Measurement script exited with code {measurement_process.returncode}'
+                    _set_measurement_status(run_id, status='failed',
+                                            error=f'Measurement script exited with code {proc.returncode}')
                 
             except Exception as e:
-                measurement_status['status'] = 'failed'
-                measurement_status['error'] = str(e)
+                _set_measurement_status(run_id, status='failed', error=str(e))
             finally:
-                measurement_status['running'] = False
-                measurement_process = None
+                exited.set()
+                _set_measurement_status(run_id, running=False)
+                with _status_lock:
+                    if measurement_process is proc:
+                        measurement_process = None
         
-        thread = threading.Thread(target=run_measurement)
-        thread.daemon = True
-        thread.start()
+        _MEASUREMENT_POOL.submit(run_measurement)
         
         return jsonify({
             'status': 'success',
@@ -756,42 +1201,28 @@ def start_measurement():
         })
     
     except Exception as e:
-        measurement_status['running'] = False
-        return jsonify({
-            'status': 'error',
-            'message': str(e)
-        }), 500
+        _set_measurement_status(running=False)
+        return _err(str(e))
 
 @app.route('/api/measurement/stop', methods=['POST'])
 def stop_measurement():
     """Stop running measurement"""
-    global measurement_process, measurement_status
-    
     try:
-        if not measurement_status['running']:
-            return jsonify({
-                'status': 'error',
-                'message': 'No measurement is running'
-            }), 400
-        
-        # Kill the process
-        if measurement_process:
-            try:
-                # Kill process and all children
-                parent = psutil.Process(measurement_process.pid)
-                for child in parent.children(recursive=True):
-                    child.kill()
-                parent.kill()
-            except:
-                pass
-        
-        measurement_status = {
-            'running': False,
-            'annotation_name': None,
-            'status': 'stopped',
-            'error': None,
-            'start_time': None
-        }
+        with _status_lock:
+            running = measurement_status.running
+        if not running:
+            return _err('No measurement is running', 400)
+        
+        # Stop the process (tree kill only if it ignores the terminate)
+        _stop_measurement_process()
+        
+        _set_measurement_status(
+            running=False,
+            annotation_name=None,
+            status='stopped',
+            error=None,
+            start_time=None
+        )
         
         return jsonify({
             'status': 'success',
@@ -799,83 +1230,208 @@ def stop_measurement():
         })
     
     except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'message': str(e)
-        }), 500
+        return _err(str(e))
+
+def _find_live_measurements_file():
+    """Return (path, stat_result) of the freshest live_measurements.json, or None if none has been written yet"""
+    # Check both possible locations for live measurements, one stat each
+    candidates = (
+        os.path.join(RESULTS_PATH, 'live_measurements.json'),
+        os.path.join(os.path.dirname(__file__), 'measurement_results', 'live_measurements.json')
+    )
+    
+    found = None
+    for path in candidates:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if found is None or st.st_mtime_ns > found[1].st_mtime_ns:
+            found = (path, st)
+    return found
+
+def _load_live_measurements(path, st):
+    """Read live measurements and annotate them with their age"""
+    file_age = time.time() - st.st_mtime
+    
+    results = dict(_cached_json(path, st))
+    
+    results['file_age_seconds'] = round(file_age, 1)
+    results['is_live'] = file_age < 30  # Consider live if updated within 30 seconds
+    return results
+
+def _send_json_file(path):
+    """Stream a JSON file as-is (sendfile where the server supports it), with ETag/Last-Modified"""
+    return send_file(path, mimetype='application/json', conditional=True, etag=True)
 
 @app.route('/api/results/live', methods=['GET'])
 def get_live_measurements():
-    """Get current live measurements (updated during measurement)"""
+    """Get current live measurements (updated during measurement)
+    
+    ?meta_only=1 returns just {file_age_seconds, is_live, size} from a stat,
+    for liveness polls that don't need the measurements themselves.
+    ?raw=1 streams the file unparsed, with the age in X-File-Age / X-Is-Live headers.
+    """
     try:
-        # Check both possible locations for live measurements
-        live_file = os.path.join(RESULTS_PATH, 'live_measurements.json')
-        alt_live_file = os.path.join(os.path.dirname(__file__), 'measurement_results', 'live_measurements.json')
-        
-        # Use whichever file exists and is more recent
-        file_to_use = None
-        if os.path.exists(live_file) and os.path.exists(alt_live_file):
-            # Both exist, use the more recent one
-            if os.path.getmtime(alt_live_file) > os.path.getmtime(live_file):
-                file_to_use = alt_live_file
-            else:
-                file_to_use = live_file
-        elif os.path.exists(alt_live_file):
-            file_to_use = alt_live_file
-        elif os.path.exists(live_file):
-            file_to_use = live_file
+        found = _find_live_measurements_file()
         
-        if not file_to_use:
+        if found is None:
             return jsonify({
                 'status': 'success',
                 'data': None,
                 'message': 'No live measurements available. Start a measurement first.'
             })
         
-        # Check if file is recent (within last 30 seconds)
-        file_age = time.time() - os.path.getmtime(file_to_use)
+        # One stat per candidate serves the age, the liveness flag, the ETag and the cache key
+        path, st = found
+        file_age = time.time() - st.st_mtime
+        is_live = file_age < 30
         
-        with open(file_to_use, 'r') as f:
-            results = json.load(f)
+        if request.args.get('meta_only'):
+            return jsonify({
+                'status': 'success',
+                'data': {
+                    'file_age_seconds': round(file_age, 1),
+                    'is_live': is_live,
+                    'size': st.st_size
+                }
+            })
         
-        results['file_age_seconds'] = round(file_age, 1)
-        results['is_live'] = file_age < 30  # Consider live if updated within 30 seconds
+        if request.args.get('raw'):
+            response = _send_json_file(path)
+            response.headers['X-File-Age'] = f'{file_age:.1f}'
+            response.headers['X-Is-Live'] = 'true' if is_live else 'false'
+            return response
         
-        return jsonify({
+        # Unchanged file (and unchanged live flag) -> let the poller keep what it has
+        etag = f'{st.st_mtime_ns}-{int(is_live)}'
+        if request.if_none_match.contains(etag):
+            return _not_modified(etag)
+        
+        results = _load_live_measurements(path, st)
+        
+        response = jsonify({
             'status': 'success',
             'data': results
         })
+        response.set_etag(etag)
+        return response
     
     except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'message': str(e)
-        }), 500
+        return _err(str(e))
+
+def _find_latest_result():
+    """(path, mtime) of the newest result JSON in RESULTS_PATH, or (None, None)"""
+    # One pass, no intermediate list (DirEntry.stat is served from the directory listing on Windows)
+    latest_path = None
+    latest_mtime = -1.0
+    try:
+        with os.scandir(RESULTS_PATH) as it:
+            for entry in it:
+                if not entry.name.endswith('.json'):
+                    continue
+                st = entry.stat(follow_symlinks=False)
+                if st.st_mtime > latest_mtime and entry.is_file(follow_symlinks=False):
+                    latest_mtime = st.st_mtime
+                    latest_path = entry.path
+    except FileNotFoundError:
+        pass
+    
+    if latest_path is None:
+        return None, None
+    return latest_path, latest_mtime
+
+# Newest result file as tracked by the results watcher; 'stale' forces a rescan
+_latest_result = {'path': None, 'mtime': None, 'stale': True}
+_latest_lock = threading.Lock()
+_results_observer = None
+
+def _note_result_file(path):
+    """Watcher saw path written; make it the latest result if it is the newest"""
+    if not path.endswith('.json'):
+        return
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return
+    with _latest_lock:
+        if _latest_result['mtime'] is None or mtime >= _latest_result['mtime']:
+            _latest_result['path'] = path
+            _latest_result['mtime'] = mtime
+
+def _forget_result_file(path):
+    """Watcher saw path removed; rescan on the next request if it was the latest"""
+    with _latest_lock:
+        if path == _latest_result['path']:
+            _latest_result['stale'] = True
+
+if FileSystemEventHandler is not None:
+    class _ResultsEventHandler(FileSystemEventHandler):
+        """Keeps _latest_result current from RESULTS_PATH change notifications"""
+        def on_created(self, event):
+            if not event.is_directory:
+                _note_result_file(event.src_path)
+
+        def on_modified(self, event):
+            if not event.is_directory:
+                _note_result_file(event.src_path)
+
+        def on_moved(self, event):
+            # Atomic saves (tmp file + os.replace) arrive as moves
+            if not event.is_directory:
+                _forget_result_file(event.src_path)
+                _note_result_file(event.dest_path)
+
+        def on_deleted(self, event):
+            if not event.is_directory:
+                _forget_result_file(event.src_path)
+
+def _start_results_watcher():
+    """Watch RESULTS_PATH (inotify / ReadDirectoryChangesW) so the latest result needs no scan"""
+    global _results_observer
+    if Observer is None:
+        return
+    try:
+        observer = Observer()
+        observer.schedule(_ResultsEventHandler(), RESULTS_PATH, recursive=False)
+        observer.start()
+    except Exception as e:
+        print(f"[WARN] Results watcher unavailable, scanning instead: {e}")
+        return
+    _results_observer = observer
+    print(f"[OK] Watching results directory: {RESULTS_PATH}")
+
+def _latest_result_file():
+    """(path, mtime) of the newest result JSON, from the watcher when it is running"""
+    if _results_observer is None:
+        return _find_latest_result()
+    with _latest_lock:
+        if not _latest_result['stale']:
+            return _latest_result['path'], _latest_result['mtime']
+        _latest_result['stale'] = False
+        _latest_result['path'] = _latest_result['mtime'] = None
+    
+    # Seed (or re-seed after a delete) with one scan; events seen meanwhile win if newer
+    path, mtime = _find_latest_result()
+    with _latest_lock:
+        if path is not None and (_latest_result['mtime'] is None or mtime > _latest_result['mtime']):
+            _latest_result['path'] = path
+            _latest_result['mtime'] = mtime
+        return _latest_result['path'], _latest_result['mtime']
 
 @app.route('/api/results/latest', methods=['GET'])
 def get_latest_results():
-    """Get latest measurement results"""
+    """Get latest measurement results (?raw=1 streams the result file unparsed)"""
     try:
-        # Find latest result file
-        result_files = []
-        if os.path.exists(RESULTS_PATH):
-            for file in os.listdir(RESULTS_PATH):
-                if file.endswith('.json'):
-                    file_path = os.path.join(RESULTS_PATH, file)
-                    result_files.append((file_path, os.path.getmtime(file_path)))
-        
-        if not result_files:
-            return jsonify({
-                'status': 'success',
-                'data': None,
-                'message': 'No results found'
-            })
+        latest_file, _ = _latest_result_file()
+        
+        if latest_file is None:
+            return app.response_class(_NO_RESULTS_BODY, mimetype='application/json')
         
-        # Get latest file
-        latest_file = max(result_files, key=lambda x: x[1])[0]
+        if request.args.get('raw'):
+            return _send_json_file(latest_file)
         
-        with open(latest_file, 'r') as f:
-            results = json.load(f)
+        results = _cached_json(latest_file)
         
         return jsonify({
             'status': 'success',
@@ -883,20 +1439,18 @@ def get_latest_results():
         })
     
     except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'message': str(e)
-        }), 500
+        return _err(str(e))
 
 @app.route('/api/calibration/status', methods=['GET'])
 def get_calibration_status():
     """Check if calibration exists"""
     calibration_file = 'camera_calibration.json'
-    exists = os.path.exists(calibration_file)
+    try:
+        calibration_data = _cached_json(calibration_file)
+    except FileNotFoundError:
+        calibration_data = None
     
-    if exists:
-        with open(calibration_file, 'r') as f:
-            calibration_data = json.load(f)
+    if calibration_data is not None:
         return jsonify({
             'status': 'success',
             'data': {
@@ -922,14 +1476,14 @@ def upload_calibration():
         
         # Validate required fields
         if not data:
-            return jsonify({'status': 'error', 'message': 'No data provided'})
+            return _err('No data provided', 200)
         
         pixels_per_cm = data.get('pixels_per_cm')
         reference_length_cm = data.get('reference_length_cm', 0)
         is_calibrated = data.get('is_calibrated', False)
         
         if not pixels_per_cm or float(pixels_per_cm) <= 0:
-            return jsonify({'status': 'error', 'message': 'Invalid pixels_per_cm value. Must be a positive number.'})
+            return _err('Invalid pixels_per_cm value. Must be a positive number.', 200)
         
         # Save to camera_calibration.json
         calibration_data = {
@@ -939,8 +1493,7 @@ def upload_calibration():
             'calibration_date': datetime.now().isoformat()
         }
         
-        with open('camera_calibration.json', 'w') as f:
-            json.dump(calibration_data, f, indent=4)
+        _write_json_file('camera_calibration.json', calibration_data)
         
         print(f"[CALIBRATION] Uploaded calibration: {calibration_data}")
         
@@ -950,18 +1503,15 @@ def upload_calibration():
             'data': calibration_data
         })
     except ValueError as e:
-        return jsonify({'status': 'error', 'message': f'Invalid number format: {str(e)}'})
+        return _err(f'Invalid number format: {str(e)}', 200)
     except Exception as e:
         print(f"[CALIBRATION] Upload error: {e}")
-        return jsonify({'status': 'error', 'message': str(e)})
+        return _err(str(e), 200)
 
-# Global state for calibration process
+# Global state for calibration process (guarded by _calibration_lock)
 calibration_process = None
-calibration_status = {
-    'running': False,
-    'status': 'idle',
-    'error': None
-}
+calibration_status = ProcStatus()
+_calibration_lock = threading.Lock()
 
 
 @app.route('/api/calibration/start', methods=['POST'])
@@ -969,56 +1519,49 @@ def start_calibration():
     """Start camera calibration process"""
     global calibration_process, calibration_status
     
-    # Check if calibration is already running
-    if calibration_status['running']:
-        return jsonify({
-            'status': 'error',
-            'message': 'Calibration is already in progress'
-        }), 409
-    
-    # Update status
-    calibration_status = {
-        'running': True,
-        'status': 'starting',
-        'error': None
-    }
+    # Check if calibration is already running and claim it in one step
+    with _calibration_lock:
+        if calibration_status.running:
+            return _err('Calibration is already in progress', 409)
+        
+        # Update status
+        calibration_status = status = ProcStatus(running=True, status='starting')
     
     # Start calibration in background
-    def run_calibration():
-        global calibration_process, calibration_status
-        try:
-            calibration_status['status'] = 'running'
-            
-            import platform
-            if platform.system() == 'Windows':
-                calibration_process = subprocess.Popen(
-                    ['python', 'calibration_worker.py', '--force-new'],
-                    creationflags=subprocess.CREATE_NEW_CONSOLE,
-                    env={**os.environ, 'PYTHONIOENCODING': 'utf-8'}
-                )
-            else:
-                calibration_process = subprocess.Popen(
-                    ['python', 'calibration_worker.py', '--force-new'],
-                    env={**os.environ, 'PYTHONIOENCODING': 'utf-8'}
-                )
-            
-            calibration_process.wait()
-            
-            if calibration_process.returncode == 0:
-                calibration_status['status'] = 'completed'
+    def on_calibration_exit(proc):
+        global calibration_process
+        with _calibration_lock:
+            if proc.returncode == 0:
+                status.status = 'completed'
             else:
-                calibration_status['status'] = 'failed'
-                calibration_status['error'] = f'Calibration exited with code {calibration_process.returncode}'
-        except Exception as e:
-            calibration_status['status'] = 'failed'
-            calibration_status['error'] = str(e)
-        finally:
-            calibration_status['running'] = False
-            calibration_process = None
+                status.status = 'failed'
+                status.error = f'Calibration exited with code {proc.returncode}'
+            status.running = False
+            if calibration_process is proc:
+                calibration_process = None
     
-    thread = threading.Thread(target=run_calibration)
-    thread.daemon = True
-    thread.start()
+    try:
+        if _IS_WINDOWS:
+            proc = subprocess.Popen(
+                ['python', 'calibration_worker.py', '--force-new'],
+                creationflags=subprocess.CREATE_NEW_CONSOLE,
+                env=WORKER_ENV
+            )
+        else:
+            proc = subprocess.Popen(
+                ['python', 'calibration_worker.py', '--force-new'],
+                env=WORKER_ENV
+            )
+    except Exception as e:
+        with _calibration_lock:
+            status.status = 'failed'
+            status.error = str(e)
+            status.running = False
+    else:
+        with _calibration_lock:
+            calibration_process = proc
+            status.status = 'running'
+        _watch_process(proc, on_calibration_exit)
     
     return jsonify({
         'status': 'success',
@@ -1030,124 +1573,98 @@ def cancel_calibration():
     """Cancel ongoing calibration"""
     global calibration_process, calibration_status
     
-    if calibration_process:
+    with _calibration_lock:
+        proc = calibration_process
+        calibration_status = ProcStatus(status='cancelled')
+    
+    if proc:
         try:
-            calibration_process.terminate()
+            proc.terminate()
         except:
             pass
     
-    calibration_status = {
-        'running': False,
-        'status': 'cancelled',
-        'error': None
-    }
-    
     return jsonify({
         'status': 'success',
         'message': 'Calibration cancelled'
     })
 
+@functools.lru_cache(maxsize=32)
+def _build_measurements(size, path, mtime_ns, file_size):
+    """Serialized /api/annotation/<size>/measurements response for one version of the annotation file"""
+    annotation_data = _read_json_file(path)
+    
+    # Extract reference distances (actual measurements)
+    reference_distances = annotation_data.get('reference_distances', [])
+    keypoint_names = annotation_data.get('keypoint_names', [])
+    
+    # Build measurement data with default tolerance of 1cm, named from keypoint_names when available
+    names = list(keypoint_names[:len(reference_distances)])
+    names += [f'Measurement {i + 1}' for i in range(len(names), len(reference_distances))]
+    measurements = [
+        {
+            'id': i + 1,
+            'name': name,
+            'actual_cm': round(distance, 2),
+            'tolerance_plus': 1.0,  # Default +1cm
+            'tolerance_minus': 1.0  # Default -1cm
+        }
+        for i, (name, distance) in enumerate(zip(names, reference_distances))
+    ]
+    
+    return _json_dumps({
+        'status': 'success',
+        'data': {
+            'size': size,
+            'measurements': measurements,
+            'total_measurements': len(measurements)
+        }
+    })
+
 @app.route('/api/annotation/<size>/measurements', methods=['GET'])
 def get_annotation_measurements(size):
     """Get measurement data from annotation file for a specific size"""
     annotation_dir = os.path.join(ANNOTATIONS_PATH, size)
-    
-    if not os.path.exists(annotation_dir):
-        return jsonify({
-            'status': 'error',
-            'message': f'No annotation found for size {size}'
-        }), 404
-    
     front_annotation = os.path.join(annotation_dir, 'front_annotation.json')
     
-    if not os.path.exists(front_annotation):
-        return jsonify({
-            'status': 'error',
-            'message': f'No front annotation found for size {size}'
-        }), 404
+    # The stat doubles as the cache key, re-registering a size invalidates it
+    try:
+        st = os.stat(front_annotation)
+    except FileNotFoundError:
+        if not os.path.exists(annotation_dir):
+            return _err(f'No annotation found for size {size}', 404)
+        return _err(f'No front annotation found for size {size}', 404)
     
     try:
-        with open(front_annotation, 'r') as f:
-            annotation_data = json.load(f)
-        
-        # Extract reference distances (actual measurements)
-        reference_distances = annotation_data.get('reference_distances', [])
-        keypoint_names = annotation_data.get('keypoint_names', [])
-        
-        # Build measurement data with default tolerance of 1cm
-        measurements = []
-        for i, distance in enumerate(reference_distances):
-            # Get measurement name from keypoint_names if available
-            if keypoint_names and i < len(keypoint_names):
-                name = keypoint_names[i]
-            else:
-                name = f'Measurement {i + 1}'
-            
-            measurements.append({
-                'id': i + 1,
-                'name': name,
-                'actual_cm': round(distance, 2),
-                'tolerance_plus': 1.0,  # Default +1cm
-                'tolerance_minus': 1.0  # Default -1cm
-            })
-        
-        return jsonify({
-            'status': 'success',
-            'data': {
-                'size': size,
-                'measurements': measurements,
-                'total_measurements': len(measurements)
-            }
-        })
+        body = _build_measurements(size, front_annotation, st.st_mtime_ns, st.st_size)
+        return app.response_class(body, mimetype='application/json')
     except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'message': f'Error reading annotation: {str(e)}'
-        }), 500
+        return _err(f'Error reading annotation: {str(e)}')
 
-# Global state for registration process
+# Global state for registration process (guarded by _registration_lock)
 registration_process = None
-registration_status = {
-    'running': False,
-    'size': None,
-    'status': 'idle',
-    'error': None,
-    'step': None  # 'calibration', 'capture', 'annotate', 'guide_box', 'save'
-}
+registration_status = ProcStatus()  # step: 'calibration', 'capture', 'annotate', 'guide_box', 'save'
+_registration_lock = threading.Lock()
 
 @app.route('/api/register/start', methods=['POST'])
 def start_registration():
     """Start shirt registration process"""
     global registration_process, registration_status
     
+    status = None
     try:
         data = request.json
         size = data.get('size')
         
         # Validate size
-        valid_sizes = ['S', 'M', 'L', 'XL', 'XXL']
-        if not size or size not in valid_sizes:
-            return jsonify({
-                'status': 'error',
-                'message': f'Invalid size. Must be one of: {", ".join(valid_sizes)}'
-            }), 400
-        
-        # Check if registration is already running
-        if registration_status['running']:
-            return jsonify({
-                'status': 'error',
-                'message': 'Registration is already in progress'
-            }), 400
+        if not size or size not in _VALID_SIZES:
+            return _err(f'Invalid size. Must be one of: {_VALID_SIZES_MSG}', 400)
         
         # Check if annotation already exists
         annotation_dir = os.path.join(ANNOTATIONS_PATH, size)
         if os.path.exists(annotation_dir):
             overwrite = data.get('overwrite', False)
             if not overwrite:
-                return jsonify({
-                    'status': 'error',
-                    'message': f'Annotation for size {size} already exists. Set overwrite=true to replace.'
-                }), 400
+                return _err(f'Annotation for size {size} already exists. Set overwrite=true to replace.', 400)
         
         # Create config for registration
         config = {
@@ -1157,64 +1674,53 @@ def start_registration():
             'annotations_path': ANNOTATIONS_PATH
         }
         
-        with open('registration_config.json', 'w') as f:
-            json.dump(config, f, indent=4)
+        # Check if registration is already running and claim it in one step
+        with _registration_lock:
+            if registration_status.running:
+                return _err('Registration is already in progress', 400)
+            
+            # Update status
+            registration_status = status = ProcStatus(running=True, size=size, status='starting', step='initializing')
         
-        # Update status
-        registration_status = {
-            'running': True,
-            'size': size,
-            'status': 'starting',
-            'error': None,
-            'step': 'initializing'
-        }
+        _write_json_file('registration_config.json', config, indent=False)
         
         # Start registration in background
-        def run_registration():
-            global registration_process, registration_status
-            try:
-                registration_status['step'] = 'running'
-                
-                # Run the registration script in a new console window (needed for camera GUI)
-                # Use CREATE_NEW_CONSOLE flag on Windows to open a visible window
-                import platform
-                
-                if platform.system() == 'Windows':
-                    # On Windows, spawn a new console window for the interactive script
-                    registration_process = subprocess.Popen(
-                        ['python', 'registration_worker.py'],
-                        creationflags=subprocess.CREATE_NEW_CONSOLE,
-                        env={**os.environ, 'PYTHONIOENCODING': 'utf-8'}
-                    )
-                else:
-                    # On other platforms, run normally
-                    registration_process = subprocess.Popen(
-                        ['python', 'registration_worker.py'],
-                        env={**os.environ, 'PYTHONIOENCODING': 'utf-8'}
-                    )
-                
-                # Wait for completion
-                registration_process.wait()
-                
-                if registration_process.returncode == 0:
-                    registration_status['status'] = 'completed'
-                    registration_status['step'] = 'completed'
+        def on_registration_exit(proc):
+            global registration_process
+            with _registration_lock:
+                if proc.returncode == 0:
+                    status.status = 'completed'
+                    status.step = 'completed'
                 else:
-                    registration_status['status'] = 'failed'
-                    registration_status['error'] = f'Registration script exited with code {registration_process.returncode}'
-                    registration_status['step'] = 'failed'
-                
-            except Exception as e:
-                registration_status['status'] = 'failed'
-                registration_status['error'] = str(e)
-                registration_status['step'] = 'failed'
-            finally:
-                registration_status['running'] = False
-                registration_process = None
-        
-        thread = threading.Thread(target=run_registration)
-        thread.daemon = True
-        thread.start()
+                    status.status = 'failed'
+                    status.error = f'Registration script exited with code {proc.returncode}'
+                    status.step = 'failed'
+                status.running = False
+                if registration_process is proc:
+                    registration_process = None
+        
+        with _registration_lock:
+            status.step = 'running'
+        
+        # Run the registration script in a new console window (needed for camera GUI)
+        # Use CREATE_NEW_CONSOLE flag on Windows to open a visible window
+        if _IS_WINDOWS:
+            # On Windows, spawn a new console window for the interactive script
+            proc = subprocess.Popen(
+                ['python', 'registration_worker.py'],
+                creationflags=subprocess.CREATE_NEW_CONSOLE,
+                env=WORKER_ENV
+            )
+        else:
+            # On other platforms, run normally in a new session so cancel can signal the whole group
+            proc = subprocess.Popen(
+                ['python', 'registration_worker.py'],
+                env=WORKER_ENV,
+                start_new_session=True
+            )
+        with _registration_lock:
+            registration_process = proc
+        _watch_process(proc, on_registration_exit)
         
         return jsonify({
             'status': 'success',
@@ -1226,18 +1732,21 @@ def start_registration():
         })
         
     except Exception as e:
-        registration_status['running'] = False
-        return jsonify({
-            'status': 'error',
-            'message': str(e)
-        }), 500
+        with _registration_lock:
+            if status is not None:
+                status.running = False
+                status.status = 'failed'
+                status.error = str(e)
+        return _err(str(e))
 
 @app.route('/api/register/status', methods=['GET'])
 def get_registration_status():
     """Get current registration status"""
+    with _registration_lock:
+        data = asdict(registration_status)
     return jsonify({
         'status': 'success',
-        'data': registration_status
+        'data': data
     })
 
 @app.route('/api/register/cancel', methods=['POST'])
@@ -1246,40 +1755,39 @@ def cancel_registration():
     global registration_process, registration_status
     
     try:
-        if not registration_status['running']:
-            return jsonify({
-                'status': 'error',
-                'message': 'No registration is running'
-            }), 400
+        with _registration_lock:
+            if not registration_status.running:
+                return _err('No registration is running', 400)
+            proc = registration_process
+            registration_status = ProcStatus(status='cancelled', step='cancelled')
         
         # Kill the process
-        if registration_process:
+        if proc:
             try:
-                parent = psutil.Process(registration_process.pid)
-                for child in parent.children(recursive=True):
-                    child.kill()
-                parent.kill()
+                if _IS_WINDOWS:
+                    # CTRL_BREAK_EVENT can't reach a CREATE_NEW_CONSOLE child, so walk the tree
+                    parent = psutil.Process(proc.pid)
+                    for child in parent.children(recursive=True):
+                        child.kill()
+                    parent.kill()
+                else:
+                    # The worker leads its own process group: one signal reaches all of it
+                    pgid = os.getpgid(proc.pid)
+                    os.killpg(pgid, signal.SIGTERM)
+                    try:
+                        proc.wait(timeout=2)
+                    except subprocess.TimeoutExpired:
+                        os.killpg(pgid, signal.SIGKILL)
             except:
                 pass
         
-        registration_status = {
-            'running': False,
-            'size': None,
-            'status': 'cancelled',
-            'error': None,
-            'step': 'cancelled'
-        }
-        
         return jsonify({
             'status': 'success',
             'message': 'Registration cancelled'
         })
         
     except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'message': str(e)
-        }), 500
+        return _err(str(e))
 
 if __name__ == '__main__':
     print("=" * 60)
@@ -1291,9 +1799,30 @@ if __name__ == '__main__':
     print(f"[STAT] Results: {RESULTS_PATH}")
     print("=" * 60)
     
-    ensure_directories()
+    print(f"[OK] Annotations directory (Laravel): {ANNOTATIONS_PATH}")
+    print(f"[OK] Results directory: {RESULTS_PATH}")
+    
+    _prewarm_measurement_worker()
+    _start_results_watcher()
+    
+    # FLASK_DEBUG=1 keeps the Werkzeug debugger for development
+    debug = os.environ.get('FLASK_DEBUG') == '1'
+    serve = None
+    if not debug:
+        try:
+            from waitress import serve
+        except ImportError:
+            print("[WARN] waitress not installed, using the Flask development server (pip install waitress)")
     
     print("\n[OK] Server starting on http://localhost:5000")
     print("[API] Laravel can now communicate with the measurement system\n")
     
-    app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
+    try:
+        if serve is not None:
+            # Thread pool so status polls don't queue behind slow requests
+            serve(app, host='0.0.0.0', port=5000, threads=8, _quiet=True)
+        else:
+            app.run(host='0.0.0.0', port=5000, debug=debug, use_reloader=False, threaded=True)
+    finally:
+        # Release pool threads still waiting on workers
+        _shutdown_event.set()
@@ -6,6 +6,7 @@ import sys
 import os
 import json
 import cv2
+import numpy as np
 import math
 import time
 from datetime import datetime
@@ -15,6 +16,19 @@ from mvsdk import *
 
 # Configuration
 CALIBRATION_FILE = 'camera_calibration.json'
+# Interactive overlays are redrawn on every mouse/key event: cheapest rasterization, no anti-aliasing
+OVERLAY_LINE_TYPE = cv2.LINE_4
+# Zoom frames this large on the GPU through OpenCV's T-API (OpenCL), when a device is available
+OPENCL_MIN_PIXELS = 3840 * 2160
+cv2.ocl.setUseOpenCL(True)
+USE_OPENCL = cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+# Arrow key codes from cv2.waitKey -> (pan_x, pan_y) step
+PAN_KEYS = {
+    81: (-50, 0),  # Left
+    83: (50, 0),   # Right
+    82: (0, -50),  # Up
+    84: (0, 50),   # Down
+}
 
 
 class CameraCalibrator:
@@ -39,6 +53,18 @@ class CameraCalibrator:
         self.pan_x = 0
         self.pan_y = 0
         
+        # Zoomed reference image for the current zoom/pan, reused by overlay-only redraws
+        self._zoom_cache = None
+        self._zoom_key = None
+        # Zoom window for the current zoom/pan state, shared by apply_zoom and the coordinate mappers
+        self._roi = None
+        self._roi_key = None
+        self._base_shape = None  # reference_image.shape, set at capture
+        self._reference_umat = None  # reference_image uploaded for OpenCL zoom, set at capture
+        
+        # Instructions panel text, rasterized once
+        self._help_mask = self._build_help_sprite()
+        
     class Camera:
         """Inner camera wrapper class"""
         def __init__(self, DevInfo):
@@ -59,7 +85,7 @@ class CameraCalibrator:
                 # Get resolution
                 width = cap.sResolutionRange.iWidthMax
                 height = cap.sResolutionRange.iHeightMax
-                self.pFrameBuffer = CameraAlignMalloc(width * height * 3, 16)
+                self.pFrameBuffer = CameraAlignMalloc(width * height, 16)  # Mono = 1 channel
                 
                 # Set exposure
                 CameraSetAeState(self.hCamera, 0)  # Disable auto-exposure
@@ -77,23 +103,28 @@ class CameraCalibrator:
                 CameraUnInit(self.hCamera)
                 CameraAlignFree(self.pFrameBuffer)
         
+        def restart(self):
+            """Pause and resume the stream to recover a stalled driver"""
+            try:
+                CameraPause(self.hCamera)
+                CameraPlay(self.hCamera)
+                return True
+            except CameraException as e:
+                print(f"[WARN] Camera restart failed: {e}")
+                return False
+        
         def grab(self):
             try:
                 pRawData, FrameHead = CameraGetImageBuffer(self.hCamera, 1000)
                 CameraImageProcess(self.hCamera, pRawData, self.pFrameBuffer, FrameHead)
                 CameraReleaseImageBuffer(self.hCamera, pRawData)
                 
-                # Return image as numpy array
-                import numpy as np
+                # Return image as a numpy view over the SDK's aligned frame buffer (no copy)
                 frame = (c_ubyte * (FrameHead.uBytes)).from_address(self.pFrameBuffer)
                 frame = np.frombuffer(frame, dtype=np.uint8)
                 
-                shape = (FrameHead.iHeight, FrameHead.iWidth)
-                if FrameHead.uiMediaType == CAMERA_MEDIA_TYPE_MONO8:
-                    frame = frame.reshape(shape)
-                else:
-                    frame = frame.reshape((shape[0], shape[1], 3))
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                # open() forces MONO8 output, so frames are always single-channel
+                frame = frame.reshape((FrameHead.iHeight, FrameHead.iWidth))
                 
                 return frame
             except CameraException:
@@ -130,13 +161,19 @@ class CameraCalibrator:
         frame = self.camera_obj.grab()
         if frame is not None:
             try:
-                # Convert grayscale to BGR for display
-                if len(frame.shape) == 2:
-                    self.reference_image = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
-                    self.reference_gray = frame.copy()
-                else:
-                    self.reference_image = frame
-                    self.reference_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                # Convert grayscale to BGR for display, into the previous capture's buffers when they fit
+                bgr_shape = frame.shape + (3,)
+                if self.reference_image is None or self.reference_image.shape != bgr_shape:
+                    self.reference_image = np.empty(bgr_shape, dtype=np.uint8)
+                    self.reference_gray = np.empty(frame.shape, dtype=np.uint8)
+                cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR, dst=self.reference_image)
+                # frame is a view of the camera buffer, keep our own copy
+                np.copyto(self.reference_gray, frame)
+                self._zoom_key = None  # Zoomed view cache was built from the old frame
+                self._base_shape = bgr_shape
+                self._reference_umat = None
+                if USE_OPENCL and frame.size >= OPENCL_MIN_PIXELS:
+                    self._reference_umat = cv2.UMat(self.reference_image)
                 
                 print(f"[OK] Reference frame captured: {self.reference_image.shape[1]}x{self.reference_image.shape[0]}")
                 return True
@@ -147,18 +184,19 @@ class CameraCalibrator:
             print("[WARN] Camera grab() returned None")
             return False
     
-    def apply_zoom(self, image):
-        """Apply zoom and pan to image"""
-        if self.zoom_factor <= 1.0:
-            return image
+    def _compute_roi(self, img_shape):
+        """Source window (x1, y1, x2, y2) that apply_zoom shows, cached per zoom/pan state"""
+        h, w = img_shape[:2]
+        if self.zoom_center is None:
+            self.zoom_center = (w // 2, h // 2)
+        
+        key = (h, w, self.zoom_factor, self.pan_x, self.pan_y, self.zoom_center)
+        if key == self._roi_key:
+            return self._roi
         
-        h, w = image.shape[:2]
         zoom_w = int(w / self.zoom_factor)
         zoom_h = int(h / self.zoom_factor)
         
-        if self.zoom_center is None:
-            self.zoom_center = (w // 2, h // 2)
-        
         center_x, center_y = self.zoom_center
         center_x += self.pan_x
         center_y += self.pan_y
@@ -171,53 +209,60 @@ class CameraCalibrator:
         x2 = min(w, x1 + zoom_w)
         y2 = min(h, y1 + zoom_h)
         
+        self._roi_key = key
+        self._roi = (x1, y1, x2, y2)
+        return self._roi
+    
+    def apply_zoom(self, image):
+        """Apply zoom and pan to image"""
+        if self.zoom_factor <= 1.0:
+            return image
+        
+        h, w = image.shape[:2]
+        x1, y1, x2, y2 = self._compute_roi(image.shape)
+        
+        if x2 <= x1 or y2 <= y1:
+            return image
+        
+        if image is self.reference_image and self._reference_umat is not None:
+            # Resize a device-side ROI of the uploaded frame, download only the result
+            roi = cv2.UMat(self._reference_umat, (y1, y2), (x1, x2))
+            return cv2.resize(roi, (w, h), interpolation=cv2.INTER_NEAREST).get()
+        
         roi = image[y1:y2, x1:x2]
-        if roi.size > 0:
-            return cv2.resize(roi, (w, h), interpolation=cv2.INTER_LINEAR)
-        return image
+        # Nearest-neighbour: redraws on every mouse/key event, and shows the real pixels to click on
+        return cv2.resize(roi, (w, h), interpolation=cv2.INTER_NEAREST)
     
     def original_to_zoomed_coords(self, orig_x, orig_y, img_shape):
         """Convert original coordinates to zoomed display coordinates"""
         if self.zoom_factor <= 1.0:
             return int(orig_x), int(orig_y)
         
-        h, w = img_shape[:2]
-        zoom_w = w / self.zoom_factor
-        zoom_h = h / self.zoom_factor
-        
-        if self.zoom_center is None:
-            self.zoom_center = (w // 2, h // 2)
-        
-        center_x, center_y = self.zoom_center
-        center_x += self.pan_x
-        center_y += self.pan_y
-        
-        x1 = max(0, center_x - zoom_w // 2)
-        y1 = max(0, center_y - zoom_h // 2)
+        x1, y1, _, _ = self._compute_roi(img_shape)
         
         zoom_x = (orig_x - x1) * self.zoom_factor
         zoom_y = (orig_y - y1) * self.zoom_factor
         
         return int(zoom_x), int(zoom_y)
     
+    def _o2z_batch(self, pts, img_shape):
+        """original_to_zoomed_coords for an (N, 2) array of points; returns a list of (x, y) tuples"""
+        pts = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+        if self.zoom_factor <= 1.0:
+            return [tuple(p) for p in pts.astype(np.int32).tolist()]
+        
+        x1, y1, _, _ = self._compute_roi(img_shape)
+        
+        # astype truncates toward zero, like int() in the scalar version
+        zoomed = ((pts - (x1, y1)) * self.zoom_factor).astype(np.int32)
+        return [tuple(p) for p in zoomed.tolist()]
+    
     def zoomed_to_original_coords(self, zoom_x, zoom_y, img_shape):
         """Convert zoomed display coordinates to original coordinates"""
         if self.zoom_factor <= 1.0:
             return zoom_x, zoom_y
         
-        h, w = img_shape[:2]
-        zoom_w = w / self.zoom_factor
-        zoom_h = h / self.zoom_factor
-        
-        if self.zoom_center is None:
-            self.zoom_center = (w // 2, h // 2)
-        
-        center_x, center_y = self.zoom_center
-        center_x += self.pan_x
-        center_y += self.pan_y
-        
-        x1 = max(0, center_x - zoom_w // 2)
-        y1 = max(0, center_y - zoom_h // 2)
+        x1, y1, _, _ = self._compute_roi(img_shape)
         
         orig_x = (zoom_x / self.zoom_factor) + x1
         orig_y = (zoom_y / self.zoom_factor) + y1
@@ -234,8 +279,19 @@ class CameraCalibrator:
         }
         
         try:
-            with open(CALIBRATION_FILE, 'w') as f:
-                json.dump(calibration_data, f, indent=4)
+            # Write a temp file and swap it in so the API server never reads a half-written file
+            tmp_file = CALIBRATION_FILE + '.tmp'
+            with open(tmp_file, 'w') as f:
+                f.write(json.dumps(calibration_data, separators=(',', ':')))
+            for attempt in range(3):
+                try:
+                    os.replace(tmp_file, CALIBRATION_FILE)
+                    break
+                except PermissionError:
+                    # Windows refuses the swap while another process has the file open
+                    if attempt == 2:
+                        raise
+                    time.sleep(0.01)
             print(f"[OK] Calibration saved to {CALIBRATION_FILE}")
             return True
         except Exception as e:
@@ -260,8 +316,8 @@ class CameraCalibrator:
                 print(f"[WARN] Could not load calibration: {e}")
         return False
     
-    def show_calibration_instructions(self, image, window_name):
-        """Display calibration instructions on image"""
+    def _build_help_sprite(self):
+        """Render the instructions panel text once; returns a mask of its (white) text pixels"""
         instructions = [
             "=== CALIBRATION CONTROLS ===",
             "",
@@ -281,16 +337,22 @@ class CameraCalibrator:
             "and click on two ends to mark distance"
         ]
         
+        # Panel covers (5, 5)-(350, 30 + n*22) inclusive; text is drawn relative to its corner
+        sprite = np.zeros((26 + len(instructions) * 22, 346), dtype=np.uint8)
+        for i, instruction in enumerate(instructions):
+            cv2.putText(sprite, instruction, (5, 20 + i * 22), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, 255, 1)
+        return sprite > 0
+    
+    def show_calibration_instructions(self, image, window_name):
+        """Display calibration instructions on image"""
         temp_img = image.copy()
         
-        # Draw semi-transparent background
-        overlay = temp_img.copy()
-        cv2.rectangle(overlay, (5, 5), (350, 30 + len(instructions) * 22), (0, 0, 0), -1)
-        temp_img = cv2.addWeighted(overlay, 0.7, temp_img, 0.3, 0)
-        
-        for i, instruction in enumerate(instructions):
-            cv2.putText(temp_img, instruction, (10, 25 + i * 22), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        # Darken the panel area (70% black overlay), then stamp the pre-rendered text
+        mask = self._help_mask[:temp_img.shape[0] - 5, :temp_img.shape[1] - 5]
+        roi = temp_img[5:5 + mask.shape[0], 5:5 + mask.shape[1]]
+        roi[:] = cv2.addWeighted(roi, 0.3, roi, 0, 0)
+        roi[mask] = (255, 255, 255)
         
         cv2.imshow(window_name, temp_img)
         cv2.waitKey(3000)  # Show for 3 seconds
@@ -311,6 +373,8 @@ class CameraCalibrator:
         input("Press Enter when ready to capture calibration frame...")
         
         # Capture calibration frame
+        # grab() already waits up to 1s for a frame, so a miss means the stream stalled:
+        # restart it (pause + play) between attempts instead of sleeping
         max_attempts = 5
         calibration_captured = False
         for attempt in range(max_attempts):
@@ -318,7 +382,8 @@ class CameraCalibrator:
             if self.capture_reference_frame():
                 calibration_captured = True
                 break
-            time.sleep(0.5)
+            if attempt + 1 < max_attempts and self.camera_obj is not None:
+                self.camera_obj.restart()
         
         if not calibration_captured:
             print("[ERR] Failed to capture calibration frame!")
@@ -332,70 +397,80 @@ class CameraCalibrator:
         
         # Calibration UI
         cal_points = []
+        distance_text = None  # Status bar text, refreshed by points_changed() rather than per redraw
+        cal_points_arr = np.empty((0, 2), dtype=np.float64)  # cal_points as an array, for the nearest-point search
         image_copy = self.reference_image.copy()
         
+        def points_changed():
+            nonlocal distance_text, cal_points_arr
+            cal_points_arr = np.asarray(cal_points, dtype=np.float64).reshape(-1, 2)
+            if len(cal_points) == 2:
+                pixel_dist = math.sqrt((cal_points[1][0] - cal_points[0][0]) ** 2 + 
+                                      (cal_points[1][1] - cal_points[0][1]) ** 2)
+                distance_text = f"Distance: {pixel_dist:.1f} pixels"
+            else:
+                distance_text = None
+        
         def redraw():
             nonlocal image_copy
-            image_copy[:] = self.reference_image.copy()
             if self.zoom_factor > 1.0:
-                image_copy[:] = self.apply_zoom(image_copy)
+                # Re-zoom only when zoom/pan changed; point edits just restore the cached base
+                key = (self.zoom_factor, self.pan_x, self.pan_y, self.zoom_center)
+                if key != self._zoom_key:
+                    self._zoom_cache = self.apply_zoom(self.reference_image)
+                    self._zoom_key = (self.zoom_factor, self.pan_x, self.pan_y, self.zoom_center)
+                image_copy[:] = self._zoom_cache
+            else:
+                image_copy[:] = self.reference_image
             
             # Draw calibration points
-            for i, point in enumerate(cal_points):
-                disp_x, disp_y = self.original_to_zoomed_coords(point[0], point[1], image_copy.shape)
-                cv2.circle(image_copy, (disp_x, disp_y), 10, (0, 255, 0), -1)
-                cv2.circle(image_copy, (disp_x, disp_y), 14, (0, 0, 255), 2)
+            disp_points = self._o2z_batch(cal_points, self._base_shape)
+            for i, (disp_x, disp_y) in enumerate(disp_points):
+                cv2.circle(image_copy, (disp_x, disp_y), 10, (0, 255, 0), -1, OVERLAY_LINE_TYPE)
+                cv2.circle(image_copy, (disp_x, disp_y), 14, (0, 0, 255), 2, OVERLAY_LINE_TYPE)
                 cv2.putText(image_copy, str(i + 1), (disp_x + 15, disp_y - 15), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 0, 0), 2)
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 0, 0), 2, OVERLAY_LINE_TYPE)
             
             # Draw line between points
             if len(cal_points) == 2:
-                disp_p1 = self.original_to_zoomed_coords(cal_points[0][0], cal_points[0][1], image_copy.shape)
-                disp_p2 = self.original_to_zoomed_coords(cal_points[1][0], cal_points[1][1], image_copy.shape)
-                cv2.line(image_copy, disp_p1, disp_p2, (255, 0, 255), 3)
-                
-                # Calculate pixel distance
-                pixel_dist = math.sqrt((cal_points[1][0] - cal_points[0][0]) ** 2 + 
-                                      (cal_points[1][1] - cal_points[0][1]) ** 2)
+                cv2.line(image_copy, disp_points[0], disp_points[1], (255, 0, 255), 3, OVERLAY_LINE_TYPE)
                 
                 # Draw status bar
-                h = image_copy.shape[0]
+                h = self._base_shape[0]
                 cv2.rectangle(image_copy, (0, h - 80), (500, h), (0, 0, 0), -1)
-                cv2.putText(image_copy, f"Distance: {pixel_dist:.1f} pixels", 
-                           (10, h - 50), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+                cv2.putText(image_copy, distance_text, 
+                           (10, h - 50), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2, OVERLAY_LINE_TYPE)
                 cv2.putText(image_copy, "Press 'S' to save, 'C' to clear", 
-                           (10, h - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+                           (10, h - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2, OVERLAY_LINE_TYPE)
             else:
                 # Show instruction
-                h = image_copy.shape[0]
+                h = self._base_shape[0]
                 cv2.rectangle(image_copy, (0, h - 50), (400, h), (0, 0, 0), -1)
                 cv2.putText(image_copy, f"Click {2 - len(cal_points)} more point(s) | H=Help", 
-                           (10, h - 15), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+                           (10, h - 15), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2, OVERLAY_LINE_TYPE)
         
         def mouse_callback(event, x, y, flags, param):
             nonlocal cal_points
             
-            orig_x, orig_y = self.zoomed_to_original_coords(x, y, image_copy.shape)
+            orig_x, orig_y = self.zoomed_to_original_coords(x, y, self._base_shape)
             
             if event == cv2.EVENT_LBUTTONDOWN and len(cal_points) < 2:
                 cal_points.append([orig_x, orig_y])
+                points_changed()
                 print(f"[*] Point {len(cal_points)} placed at ({int(orig_x)}, {int(orig_y)})")
                 if len(cal_points) == 2:
                     print("[OK] Two points marked! Press 'S' to save calibration.")
                 redraw()
             
             elif event == cv2.EVENT_RBUTTONDOWN and len(cal_points) > 0:
-                # Remove nearest point
-                min_dist = float('inf')
-                nearest_idx = -1
-                for i, pt in enumerate(cal_points):
-                    dist = math.sqrt((pt[0] - orig_x) ** 2 + (pt[1] - orig_y) ** 2)
-                    if dist < min_dist:
-                        min_dist = dist
-                        nearest_idx = i
+                # Remove nearest point (compared on squared distance, no sqrt needed)
+                diff = cal_points_arr - (orig_x, orig_y)
+                dist2 = np.einsum('ij,ij->i', diff, diff)
+                nearest_idx = int(np.argmin(dist2))
                 
-                if min_dist < 100:  # Within reasonable distance
+                if dist2[nearest_idx] < 100 ** 2:  # Within reasonable distance
                     cal_points.pop(nearest_idx)
+                    points_changed()
                     print(f"[*] Removed point {nearest_idx + 1}")
                     redraw()
         
@@ -416,6 +491,19 @@ class CameraCalibrator:
             cv2.imshow(window_name, image_copy)
             key = cv2.waitKey(1) & 0xFF
             
+            # Drain queued arrow-key repeats into a single pan + redraw;
+            # the first non-pan key read (255 if none) falls through to the handlers below
+            if key in PAN_KEYS:
+                dx = dy = 0
+                while key in PAN_KEYS:
+                    step_x, step_y = PAN_KEYS[key]
+                    dx += step_x
+                    dy += step_y
+                    key = cv2.waitKey(1) & 0xFF
+                self.pan_x += dx
+                self.pan_y += dy
+                redraw()
+            
             if key == ord('s') or key == ord('S'):
                 if len(cal_points) == 2:
                     # Calculate pixel distance
@@ -459,6 +547,7 @@ class CameraCalibrator:
             
             elif key == ord('c') or key == ord('C'):
                 cal_points = []
+                points_changed()
                 redraw()
                 print("[*] Points cleared.")
             
@@ -480,19 +569,6 @@ class CameraCalibrator:
                 redraw()
                 print("Zoom reset")
             
-            elif key == 81:  # Left arrow
-                self.pan_x -= 50
-                redraw()
-            elif key == 83:  # Right arrow
-                self.pan_x += 50
-                redraw()
-            elif key == 82:  # Up arrow
-                self.pan_y -= 50
-                redraw()
-            elif key == 84:  # Down arrow
-                self.pan_y += 50
-                redraw()
-            
             elif key == ord('h') or key == ord('H'):
                 self.show_calibration_instructions(image_copy, window_name)
             
@@ -1,11 +1,22 @@
 import json
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def load_json(path):
+    """Load a JSON file, with orjson when it is installed"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
 
 # Load both files
-with open('testjson/annotation_data.json', 'r') as f:
-    test = json.load(f)
-    
-with open('temp_annotations/ADD-TS-001_S.json', 'r') as f:
-    db = json.load(f)
+test = load_json('testjson/annotation_data.json')
+db = load_json('temp_annotations/ADD-TS-001_S.json')
 
 print('=' * 70)
 print('KEYPOINT COMPARISON: testjson vs Database')
@@ -19,19 +30,27 @@ print()
 print('Index | Testjson (x, y)     | Database (x, y)     | Match?')
 print('-' * 70)
 
-for i in range(max(len(test['keypoints']), len(db['keypoints']))):
-    test_pt = test['keypoints'][i] if i < len(test['keypoints']) else None
-    db_pt = db['keypoints'][i] if i < len(db['keypoints']) else None
-    
-    if test_pt and db_pt:
-        # Check if points are close (within 200px)
-        dist = ((test_pt[0] - db_pt[0])**2 + (test_pt[1] - db_pt[1])**2)**0.5
-        match = 'YES' if dist < 200 else 'NO'
-        print(f'{i:5} | ({test_pt[0]:4}, {test_pt[1]:4})     | ({db_pt[0]:4}, {db_pt[1]:4})     | {match} ({dist:.0f}px)')
-    elif test_pt:
-        print(f'{i:5} | ({test_pt[0]:4}, {test_pt[1]:4})     | MISSING              | -')
-    elif db_pt:
-        print(f'{i:5} | MISSING              | ({db_pt[0]:4}, {db_pt[1]:4})     | -')
+# Distances for all paired keypoints in one pass; points are close if within 200px
+test_kps = test['keypoints']
+db_kps = db['keypoints']
+test_arr = np.asarray(test_kps, dtype=np.float64).reshape(-1, 2)
+db_arr = np.asarray(db_kps, dtype=np.float64).reshape(-1, 2)
+n = min(len(test_arr), len(db_arr))
+diffs = test_arr[:n] - db_arr[:n]
+dists = np.sqrt(np.einsum('ij,ij->i', diffs, diffs))
+matches = dists < 200
+
+for i, (test_pt, db_pt, dist, close) in enumerate(zip(test_kps, db_kps, dists.tolist(), matches.tolist())):
+    match = 'YES' if close else 'NO'
+    print(f'{i:5} | ({test_pt[0]:4}, {test_pt[1]:4})     | ({db_pt[0]:4}, {db_pt[1]:4})     | {match} ({dist:.0f}px)')
+
+# Unpaired tail of whichever annotation has more points
+for i in range(n, len(test_kps)):
+    test_pt = test_kps[i]
+    print(f'{i:5} | ({test_pt[0]:4}, {test_pt[1]:4})     | MISSING              | -')
+for i in range(n, len(db_kps)):
+    db_pt = db_kps[i]
+    print(f'{i:5} | MISSING              | ({db_pt[0]:4}, {db_pt[1]:4})     | -')
 
 print()
 print('=' * 70)
@@ -42,14 +61,15 @@ print('=' * 70)
 # like shoulder, armhole, hem, etc. The order matters for measurements.
 # Let's analyze if the point positions suggest different ordering
 
+# Stable argsort on the y column keeps the original order for equal y, like sorted() did
 print('\nTestjson keypoint locations (sorted by y):')
-test_sorted = sorted(enumerate(test['keypoints']), key=lambda x: x[1][1])
-for idx, (orig_idx, pt) in enumerate(test_sorted[:5]):
+for idx, orig_idx in enumerate(np.argsort(test_arr[:, 1], kind='stable')[:5].tolist()):
+    pt = test_kps[orig_idx]
     print(f'  Top {idx+1}: Point {orig_idx} at ({pt[0]}, {pt[1]})')
 
 print('\nDatabase keypoint locations (sorted by y):')
-db_sorted = sorted(enumerate(db['keypoints']), key=lambda x: x[1][1])
-for idx, (orig_idx, pt) in enumerate(db_sorted[:5]):
+for idx, orig_idx in enumerate(np.argsort(db_arr[:, 1], kind='stable')[:5].tolist()):
+    pt = db_kps[orig_idx]
     print(f'  Top {idx+1}: Point {orig_idx} at ({pt[0]}, {pt[1]})')
 
 print()
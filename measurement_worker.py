@@ -2,18 +2,26 @@ import sys
 import os
 import json
 import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+import platform
 from measurment2 import LiveKeypointDistanceMeasurer
 
 def run_headless_measurement():
     # Load config created by api_server.py
     config_file = 'measurement_config.json'
-    if not os.path.exists(config_file):
+    try:
+        with open(config_file, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
         print(f"[ERR] Config file {config_file} not found")
         sys.exit(1)
         
     try:
-        with open(config_file, 'r') as f:
-            config = json.load(f)
+        config = orjson.loads(raw) if orjson is not None else json.loads(raw)
             
         annotation_name = config.get('annotation_name')  # Size (e.g., 'XXL')
         article_style = config.get('article_style')      # Article style (e.g., 'NKE-TS-001')
@@ -62,11 +70,15 @@ def run_headless_measurement():
                 print(f"[ERR] No annotation path provided in config")
                 sys.exit(1)
         
-        # Set reference image path
-        if reference_image_path and os.path.exists(reference_image_path):
+        # Set reference image path (one stat gives both existence and size)
+        try:
+            reference_image_st = os.stat(reference_image_path)
+        except (OSError, TypeError):
+            reference_image_st = None
+        if reference_image_st is not None:
             measurer.reference_image_file = reference_image_path
             print(f"[LOAD] Using reference image: {reference_image_path}")
-            print(f"[FILE] Reference image size: {os.path.getsize(reference_image_path)} bytes")
+            print(f"[FILE] Reference image size: {reference_image_st.st_size} bytes")
         else:
             # Fallback to old folder-based structure
             annotation_path = config.get('annotation_path')
@@ -98,8 +110,26 @@ def run_headless_measurement():
         import traceback
         traceback.print_exc()
         print("\n[PAUSE] Worker crashed. Press Enter to close window...")
-        input()
+        try:
+            input()
+        except EOFError:
+            pass
         sys.exit(1)
 
+def wait_for_job():
+    """Standby mode: imports are done, block until api_server has written the config"""
+    if not sys.stdin.readline():
+        sys.exit(0)  # Server went away without handing us a job
+    
+    if platform.system() == 'Windows':
+        # stdin was a pipe, which also pointed stdout/stderr at the server's console;
+        # switch back to this process's own (hidden) console and show it
+        import ctypes
+        sys.stdin = open('CONIN$', 'r')
+        sys.stdout = sys.stderr = open('CONOUT$', 'w', encoding='utf-8', buffering=1)
+        ctypes.windll.user32.ShowWindow(ctypes.windll.kernel32.GetConsoleWindow(), 5)  # SW_SHOW
+
 if __name__ == "__main__":
+    if '--standby' in sys.argv:
+        wait_for_job()
     run_headless_measurement()
@@ -12,8 +12,24 @@ from mvsdk import *
 import platform
 import json
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from scipy import ndimage
+from scipy.spatial.distance import pdist
 import base64
+from datetime import datetime, timezone
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Parse JSON bytes with orjson when it is installed
+json_loads = orjson.loads if orjson is not None else json.loads
+
+# Robust estimator for the reference->live homography
+HOMOGRAPHY_METHOD = getattr(cv2, 'USAC_MAGSAC', cv2.RANSAC)
 
 class LiveKeypointDistanceMeasurer:
     def __init__(self):
@@ -46,6 +62,8 @@ class LiveKeypointDistanceMeasurer:
         self.pan_y = 0
         self.current_format = None
         self.last_measurements = []
+        self._last_live_write = 0.0  # time.monotonic() of the last live_measurements.json write
+        self.LIVE_WRITE_INTERVAL = 0.1  # Cap live result writes at 10 Hz
         self.placement_box = []  # [x1, y1, x2, y2] for shirt placement guide
         
         # Resolution handling for webcam vs native camera images
@@ -70,12 +88,17 @@ class LiveKeypointDistanceMeasurer:
         self.reference_image_file = "reference_image.jpg"
         self.back_reference_image_file = "back_reference_image.jpg"  # NEW: Back side reference image
         
-        # MULTIPLE Feature matching parameters
-        self.feature_detectors = {
-            'orb': cv2.ORB_create(nfeatures=3500),  # Primary detector for speed
-            'brisk': cv2.BRISK_create()  # Secondary detector
-        }
-        self.matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=False)  # For binary descriptors
+        # Feature matching parameters (ORB only: every descriptor is 32-byte binary)
+        self.orb = cv2.ORB_create(nfeatures=3500, scaleFactor=1.2, nlevels=8, edgeThreshold=19, fastThreshold=12)
+        self.orb_fast = cv2.ORB_create(nfeatures=800, fastThreshold=20, nlevels=4)  # Once keypoints are stabilized
+        # Reference descriptors the live frames are matched against, per side; see set_reference_descriptors()
+        self._ref_desc = {'front': None, 'back': None}
+        # Run ORB through OpenCV's T-API (OpenCL) when a GPU/iGPU is available
+        cv2.ocl.setUseOpenCL(True)
+        self._use_umat = cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+        # Reference image features by id(image) -> (image, keypoints, descriptors), see _reference_features()
+        self._ref_feat_cache = {}
+        self._ref_feat_lock = threading.Lock()  # front/back references load in parallel
         self.min_matches = 15  # Reduced for faster processing
         self.good_match_ratio = 0.75
         
@@ -95,9 +118,34 @@ class LiveKeypointDistanceMeasurer:
         self.last_transfer_time = 0
         self.transfer_interval = 0.06  # Faster transfer for responsiveness
         
+        # Per-frame error logging is capped per key, see _log_error()
+        self._error_counts = {}
+        self._error_limit = 5
+        # Per-transfer status lines ([FIX]/[STAT]) are printed once every transfer_log_interval transfers
+        self._transfer_count = 0
+        self.transfer_log_interval = 30
+        
+        # Lucas-Kanade tracking of the transferred keypoints between full ORB transfers
+        self._prev_gray = None
+        self._prev_tracked = None  # (N,1,2) float32 of the valid transferred points
+        self._prev_tracked_idx = None  # Their indices in transferred_keypoints
+        self._prev_count = 0
+        self._flow_frames = 0
+        self.flow_min_status = 0.9  # Fraction of points LK must keep to trust the track
+        self.flow_max_frames = 30  # Force a full transfer after this many tracked frames to bound drift
+        self._flow_scale = (1.0, 1.0)  # Live / matching resolution, to run tracked points through the stabilizer
+        self._last_transfer_homography = False  # Only a homography transfer is trusted to seed tracking
+        self._flow_lost = False  # LK lost the track; the recovery transfer must use the full ORB detector
+        
         # Template matching for fallback
         self.template_roi_size = 85
         self.template_matching_threshold = 0.70
+        self.template_pyramid_levels = 2  # Coarse search at 1/4 scale, then refine at full resolution
+        # Per-keypoint template searches are independent and OpenCV releases the GIL inside them;
+        # kept small because matchTemplate/pyrDown already run on OpenCV's own thread pool
+        self._template_pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+        # Reference templates (and their coarse pyramid level) per set of template rects, see _reference_templates()
+        self._template_cache = {}
         
         # Size adaptation parameters
         self.last_detected_scale = 1.0
@@ -131,12 +179,34 @@ class LiveKeypointDistanceMeasurer:
         self.last_mouse_x = 0
         self.last_mouse_y = 0
 
+    # BGR display copies of the references. Camera captures only store the mono frame;
+    # the BGR version is built from it the first time something draws on it.
+    @property
+    def reference_image(self):
+        if self._reference_image is None and self.reference_gray is not None:
+            self._reference_image = cv2.cvtColor(self.reference_gray, cv2.COLOR_GRAY2BGR)
+        return self._reference_image
+
+    @reference_image.setter
+    def reference_image(self, image):
+        self._reference_image = image
+
+    @property
+    def back_reference_image(self):
+        if self._back_reference_image is None and self.back_reference_gray is not None:
+            self._back_reference_image = cv2.cvtColor(self.back_reference_gray, cv2.COLOR_GRAY2BGR)
+        return self._back_reference_image
+
+    @back_reference_image.setter
+    def back_reference_image(self, image):
+        self._back_reference_image = image
+
     def load_calibration(self):
         """Load calibration data from JSON file"""
         try:
             if os.path.exists(self.calibration_file):
-                with open(self.calibration_file, 'r') as f:
-                    calibration_data = json.load(f)
+                with open(self.calibration_file, 'rb') as f:
+                    calibration_data = json_loads(f.read())
                 
                 self.pixels_per_cm = calibration_data.get('pixels_per_cm', 0)
                 self.reference_length_cm = calibration_data.get('reference_length_cm', 0)
@@ -165,11 +235,10 @@ class LiveKeypointDistanceMeasurer:
                 'pixels_per_cm': self.pixels_per_cm,
                 'reference_length_cm': self.reference_length_cm,
                 'is_calibrated': self.is_calibrated,
-                'calibration_date': str(np.datetime64('now'))
+                'calibration_date': datetime.now(timezone.utc).isoformat(timespec='seconds')
             }
             
-            with open(self.calibration_file, 'w') as f:
-                json.dump(calibration_data, f, indent=4)
+            self._write_json_atomic(self.calibration_file, calibration_data, indent=True)
             
             print("[SAVE] Calibration saved successfully!")
             return True
@@ -178,8 +247,37 @@ class LiveKeypointDistanceMeasurer:
             print(f"[ERR] Error saving calibration: {e}")
             return False
 
+    @staticmethod
+    def _write_json_atomic(path, data, indent=False):
+        """Serialize data in memory, write it to a temp file and swap it in, so readers
+        (API server, Laravel UI) never see a half-written file.
+        """
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+            payload = orjson.dumps(data, option=option)
+        elif indent:
+            payload = json.dumps(data, indent=4).encode('utf-8')
+        else:
+            payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        tmp_file = path + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(payload)
+        for attempt in range(3):
+            try:
+                os.replace(tmp_file, path)
+                return
+            except PermissionError:
+                # Windows refuses the swap while another process has the file open
+                if attempt == 2:
+                    raise
+                time.sleep(0.01)
+
     def save_live_measurements(self, measurements, annotation_name=None):
         """Save current live measurements to JSON file for Laravel UI access"""
+        now = time.monotonic()
+        if now - self._last_live_write < self.LIVE_WRITE_INTERVAL:
+            return True
+        self._last_live_write = now
         try:
             # Determine output path
             if hasattr(self, 'annotations_dir') and self.annotations_dir:
@@ -191,7 +289,7 @@ class LiveKeypointDistanceMeasurer:
             
             # Build measurement data
             measurement_data = {
-                'timestamp': str(np.datetime64('now')),
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
                 'annotation_name': annotation_name or getattr(self, 'current_annotation_name', 'unknown'),
                 'side': self.current_side if hasattr(self, 'current_side') else 'front',
                 'is_calibrated': self.is_calibrated,
@@ -226,21 +324,20 @@ class LiveKeypointDistanceMeasurer:
                 })
             
             # Save to live_measurements.json (always overwritten with latest)
-            live_file = os.path.join(results_dir, 'live_measurements.json')
-            with open(live_file, 'w') as f:
-                json.dump(measurement_data, f, indent=4)
-            
+            self._write_json_atomic(os.path.join(results_dir, 'live_measurements.json'), measurement_data)
             return True
         except Exception as e:
-            print(f"[ERR] Error saving live measurements: {e}")
+            self._log_error('live_save', f"[ERR] Error saving live measurements: {e}")
             return False
 
     def save_reference_image(self):
         """Save reference image to file"""
         try:
-            if self.reference_image is not None:
+            # Save the mono frame as-is unless a BGR image was loaded or already built
+            image = self._reference_image if self._reference_image is not None else self.reference_gray
+            if image is not None:
                 # Save reference image as JPEG
-                success = cv2.imwrite(self.reference_image_file, self.reference_image)
+                success = cv2.imwrite(self.reference_image_file, image)
                 if success:
                     print(f"[SAVE] Reference image saved: {self.reference_image_file}")
                     return True
@@ -257,9 +354,10 @@ class LiveKeypointDistanceMeasurer:
     def save_back_reference_image(self):
         """Save back reference image to file"""
         try:
-            if self.back_reference_image is not None:
+            image = self._back_reference_image if self._back_reference_image is not None else self.back_reference_gray
+            if image is not None:
                 # Save back reference image as JPEG
-                success = cv2.imwrite(self.back_reference_image_file, self.back_reference_image)
+                success = cv2.imwrite(self.back_reference_image_file, image)
                 if success:
                     print(f"[SAVE] Back reference image saved: {self.back_reference_image_file}")
                     return True
@@ -284,9 +382,12 @@ class LiveKeypointDistanceMeasurer:
                 file_size = os.path.getsize(self.reference_image_file)
                 print(f"[DEBUG] Reference image file size: {file_size} bytes")
                 
-                self.reference_image = cv2.imread(self.reference_image_file)
-                if self.reference_image is not None:
-                    img_height, img_width = self.reference_image.shape[:2]
+                # Decode straight to grayscale; the BGR display copy is derived lazily by the property
+                gray = cv2.imdecode(np.fromfile(self.reference_image_file, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+                if gray is not None:
+                    self.reference_gray = gray
+                    self.reference_image = None
+                    img_height, img_width = gray.shape[:2]
                     
                     # Detect if reference is webcam resolution (upscaled to native)
                     # Check for signs of upscaling: native dimensions but low detail
@@ -307,15 +408,14 @@ class LiveKeypointDistanceMeasurer:
                         self.reference_scale_factor = 1.0
                         print(f"[RES] Reference is at UNKNOWN resolution ({img_width}x{img_height})")
                     
-                    # Create grayscale version for processing
-                    self.reference_gray = cv2.cvtColor(self.reference_image, cv2.COLOR_BGR2GRAY)
+                    self._reset_reference_features()
                     print(f"[OK] Reference image loaded: {self.reference_image_file}")
-                    print(f"[DIM] BGR Image dimensions: {self.reference_image.shape}")
                     print(f"[DIM] Grayscale dimensions: {self.reference_gray.shape}")
                     
                     # Create matching-resolution version for feature matching
                     # Always work at webcam resolution for matching to avoid upscaled blur
                     self._prepare_matching_images()
+                    self._load_reference_features()
                     
                     return True
                 else:
@@ -334,14 +434,18 @@ class LiveKeypointDistanceMeasurer:
             return
         
         img_height, img_width = self.reference_gray.shape[:2]
+        self._reset_reference_features()
         
         # If reference is larger than webcam resolution, resize for matching
         if img_width > self.WEBCAM_WIDTH:
-            self.reference_gray_matching = cv2.resize(
+            matching = cv2.resize(
                 self.reference_gray, 
                 (self.WEBCAM_WIDTH, self.WEBCAM_HEIGHT),
                 interpolation=cv2.INTER_AREA  # Best for downscaling
             )
+            # Published under the cache lock so a concurrent back-side reset sees either image consistently
+            with self._ref_feat_lock:
+                self.reference_gray_matching = matching
             scale_factor = self.WEBCAM_WIDTH / img_width
             print(f"[MATCH] Created matching reference at {self.WEBCAM_WIDTH}x{self.WEBCAM_HEIGHT}")
             print(f"[MATCH] Scale factor for keypoints: {scale_factor:.3f}")
@@ -355,20 +459,66 @@ class LiveKeypointDistanceMeasurer:
             print(f"[MATCH] Scaled {len(self.keypoints_matching)} keypoints to matching resolution")
         else:
             # Reference is already at or below matching resolution
-            self.reference_gray_matching = self.reference_gray.copy()
+            matching = self.reference_gray.copy()
+            with self._ref_feat_lock:
+                self.reference_gray_matching = matching
             self.keypoints_matching = [kp.copy() if isinstance(kp, list) else list(kp) for kp in self.keypoints]
             print(f"[MATCH] Using reference as-is for matching (already at {img_width}x{img_height})")
 
+    def _reference_features_file(self):
+        return self.reference_image_file + '.features.npz'
+
+    def _load_reference_features(self):
+        """Seed the matching reference's ORB features from the .npz sidecar, or extract and write it.
+        
+        The sidecar is stamped with the reference file's mtime/size and the ORB settings, so
+        re-saving the image or retuning the detector invalidates it without any explicit cleanup.
+        """
+        image = self.reference_gray_matching
+        if image is None:
+            return
+        path = self._reference_features_file()
+        try:
+            st = os.stat(self.reference_image_file)
+        except OSError:
+            return
+        stamp = np.array([st.st_mtime_ns, st.st_size, image.shape[0], image.shape[1],
+                          self.orb.getMaxFeatures(), self.orb.getNLevels(),
+                          self.orb.getEdgeThreshold(), self.orb.getFastThreshold()], dtype=np.int64)
+        
+        try:
+            with np.load(path) as data:
+                if np.array_equal(data['stamp'], stamp):
+                    pts = data['points']
+                    desc = data['descriptors']
+                    with self._ref_feat_lock:
+                        self._ref_feat_cache[id(image)] = (image, pts, desc if len(desc) else None)
+                    print(f"[MATCH] Loaded {len(pts)} reference features from {path}")
+                    return
+        except (OSError, KeyError, ValueError):
+            pass
+        
+        pts, desc = self._reference_features(image)
+        if desc is None:
+            desc = np.empty((0, 32), dtype=np.uint8)
+        try:
+            np.savez(path, stamp=stamp, points=pts, descriptors=desc)
+        except OSError as e:
+            print(f"[WARN] Could not write reference features cache: {e}")
+
     def load_back_reference_image(self):
         """Load back reference image from file"""
         try:
             if os.path.exists(self.back_reference_image_file):
-                self.back_reference_image = cv2.imread(self.back_reference_image_file)
-                if self.back_reference_image is not None:
-                    # Create grayscale version for faster processing
-                    self.back_reference_gray = cv2.cvtColor(self.back_reference_image, cv2.COLOR_BGR2GRAY)
+                # Decode straight to grayscale; the BGR display copy is derived lazily by the property
+                gray = cv2.imdecode(np.fromfile(self.back_reference_image_file, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+                if gray is not None:
+                    self.back_reference_gray = gray
+                    self.back_reference_image = None
+                    # May run alongside the front load; keep the front features it has already seeded
+                    self._reset_reference_features(back_only=True)
                     print(f"[OK] Back reference image loaded: {self.back_reference_image_file}")
-                    print(f"[DIM] Image dimensions: {self.back_reference_image.shape[1]}x{self.back_reference_image.shape[0]}")
+                    print(f"[DIM] Image dimensions: {gray.shape[1]}x{gray.shape[0]}")
                     return True
                 else:
                     print("[ERR] Failed to load back reference image")
@@ -384,8 +534,8 @@ class LiveKeypointDistanceMeasurer:
         """Load annotation data from JSON file and reference image"""
         try:
             if os.path.exists(self.annotation_file):
-                with open(self.annotation_file, 'r') as f:
-                    annotation_data = json.load(f)
+                with open(self.annotation_file, 'rb') as f:
+                    annotation_data = json_loads(f.read())
                 
                 self.keypoints = annotation_data.get('keypoints', [])
                 self.target_distances = annotation_data.get('target_distances', {})
@@ -422,8 +572,8 @@ class LiveKeypointDistanceMeasurer:
         """Load back annotation data from JSON file and reference image"""
         try:
             if os.path.exists(self.back_annotation_file):
-                with open(self.back_annotation_file, 'r') as f:
-                    annotation_data = json.load(f)
+                with open(self.back_annotation_file, 'rb') as f:
+                    annotation_data = json_loads(f.read())
                 
                 self.back_keypoints = annotation_data.get('keypoints', [])
                 self.back_target_distances = annotation_data.get('target_distances', {})
@@ -453,6 +603,14 @@ class LiveKeypointDistanceMeasurer:
             print(f"[ERR] Error loading back annotation: {e}")
             return False
 
+    def load_annotations(self):
+        """Load front and back annotations concurrently; returns (front_loaded, back_loaded)"""
+        # The two sides share no data and OpenCV releases the GIL while decoding/extracting
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            front = pool.submit(self.load_annotation)
+            back = pool.submit(self.load_back_annotation)
+            return front.result(), back.result()
+
     def save_annotation(self):
         """Save annotation data to JSON file and reference image"""
         try:
@@ -460,11 +618,10 @@ class LiveKeypointDistanceMeasurer:
                 'keypoints': self.keypoints,
                 'target_distances': self.target_distances,
                 'placement_box': getattr(self, 'placement_box', []),  # Add placement box
-                'annotation_date': str(np.datetime64('now'))
+                'annotation_date': datetime.now(timezone.utc).isoformat(timespec='seconds')
             }
             
-            with open(self.annotation_file, 'w') as f:
-                json.dump(annotation_data, f, indent=4)
+            self._write_json_atomic(self.annotation_file, annotation_data, indent=True)
             
             print("[SAVE] Annotation data saved successfully!")
             print(f"[PTS] Saved {len(self.keypoints)} keypoints")
@@ -489,11 +646,10 @@ class LiveKeypointDistanceMeasurer:
             annotation_data = {
                 'keypoints': self.back_keypoints,
                 'target_distances': self.back_target_distances,
-                'annotation_date': str(np.datetime64('now'))
+                'annotation_date': datetime.now(timezone.utc).isoformat(timespec='seconds')
             }
             
-            with open(self.back_annotation_file, 'w') as f:
-                json.dump(annotation_data, f, indent=4)
+            self._write_json_atomic(self.back_annotation_file, annotation_data, indent=True)
             
             print("[SAVE] Back annotation data saved successfully!")
             print(f"[PTS] Saved {len(self.back_keypoints)} back keypoints")
@@ -559,6 +715,7 @@ class LiveKeypointDistanceMeasurer:
             self.reference_gray = None
             self.back_reference_image = None
             self.back_reference_gray = None
+            self._reset_reference_features()
             self.placement_box = []
             
             if files_deleted == 0:
@@ -673,17 +830,12 @@ class LiveKeypointDistanceMeasurer:
         frame = self.camera_obj.grab()
         if frame is not None:
             try:
-                # Squeeze mono (h,w,1) to grayscale (h,w)
-                if len(frame.shape) == 3 and frame.shape[2] == 1:
-                    frame_2d = frame[:, :, 0]
-                else:
-                    frame_2d = frame
-                
-                # Convert grayscale to BGR for display and annotation
-                self.reference_image = cv2.cvtColor(frame_2d, cv2.COLOR_GRAY2BGR)
-                # Keep proper 2D grayscale for processing
-                self.reference_gray = frame_2d.copy()
-                print(f"[OK] Reference frame captured: {self.reference_image.shape[1]}x{self.reference_image.shape[0]}")
+                # Lift the frame out of the camera buffer once, as contiguous 2D uint8;
+                # the BGR display version is derived lazily by the reference_image property
+                self.reference_gray = np.array(self.ensure_grayscale(frame), dtype=np.uint8, order='C')
+                self.reference_image = None
+                self._reset_reference_features()
+                print(f"[OK] Reference frame captured: {self.reference_gray.shape[1]}x{self.reference_gray.shape[0]}")
                 print(f"[OK] Reference gray shape: {self.reference_gray.shape}")
                 return True
             except Exception as e:
@@ -697,17 +849,12 @@ class LiveKeypointDistanceMeasurer:
         """Capture a back reference frame from camera"""
         frame = self.camera_obj.grab()
         if frame is not None:
-            # Squeeze mono (h,w,1) to grayscale (h,w)
-            if len(frame.shape) == 3 and frame.shape[2] == 1:
-                frame_2d = frame[:, :, 0]
-            else:
-                frame_2d = frame
-            
-            # Convert grayscale to BGR for display and annotation
-            self.back_reference_image = cv2.cvtColor(frame_2d, cv2.COLOR_GRAY2BGR)
-            # Keep proper 2D grayscale for processing
-            self.back_reference_gray = frame_2d.copy()
-            print(f"Back reference frame captured: {self.back_reference_image.shape[1]}x{self.back_reference_image.shape[0]}")
+            # Lift the frame out of the camera buffer once, as contiguous 2D uint8;
+            # the BGR display version is derived lazily by the back_reference_image property
+            self.back_reference_gray = np.array(self.ensure_grayscale(frame), dtype=np.uint8, order='C')
+            self.back_reference_image = None
+            self._reset_reference_features(back_only=True)
+            print(f"Back reference frame captured: {self.back_reference_gray.shape[1]}x{self.back_reference_gray.shape[0]}")
             print(f"[OK] Back reference gray shape: {self.back_reference_gray.shape}")
             return True
         return False
@@ -716,142 +863,182 @@ class LiveKeypointDistanceMeasurer:
         """Capture a live frame from camera - returns proper 2D grayscale for processing"""
         frame = self.camera_obj.grab()
         if frame is not None:
-            # Squeeze mono (h,w,1) to grayscale (h,w)
-            if len(frame.shape) == 3 and frame.shape[2] == 1:
-                return frame[:, :, 0]
-            return frame
+            return self.ensure_grayscale(frame)
         return None
 
-    def extract_features_fast(self, image):
-        """Extract features using fast methods optimized for grayscale"""
+    @staticmethod
+    def ensure_grayscale(image):
+        """Return image as a C-contiguous 2D grayscale array (no copy for contiguous mono frames)"""
+        if image.ndim == 2:
+            return image if image.flags.c_contiguous else np.ascontiguousarray(image)
+        if image.shape[-1] == 1:
+            # Mono (h,w,1): reshape is a free view on the camera buffer
+            return np.ascontiguousarray(image.reshape(image.shape[0], image.shape[1]))
+        if image.shape[-1] == 3:
+            return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return image
+
+    def _log_error(self, key, msg):
+        """Print msg at most _error_limit times per key, so a persistently failing frame loop doesn't flood stdout"""
+        count = self._error_counts.get(key, 0)
+        if count < self._error_limit:
+            print(msg)
+            if count + 1 == self._error_limit:
+                print(f"[WARN] Suppressing further '{key}' messages")
+        self._error_counts[key] = count + 1
+
+    def extract_features_fast(self, image, fast=None):
+        """Extract features using fast methods optimized for grayscale
+        
+        Returns keypoint coordinates as an (N, 2) float32 array, not cv2.KeyPoint objects;
+        nothing downstream needs more than pt. fast picks the reduced ORB detector; by
+        default it follows keypoint_stabilized.
+        """
         # Handle different input formats
         if image is None:
-            return [], None
-        
-        # Ensure 2D grayscale
-        if len(image.shape) == 3:
-            if image.shape[2] == 1:
-                # Mono channel (h,w,1) - squeeze to (h,w)
-                gray = image[:, :, 0]
-            elif image.shape[2] == 3:
-                # BGR - convert to grayscale
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            else:
-                gray = image
-        else:
-            # Already 2D grayscale
-            gray = image
+            return np.empty((0, 2), dtype=np.float32), None
+        
+        # Callers normally pass 2D grayscale already; only normalise anything else
+        gray = image if image.ndim == 2 else self.ensure_grayscale(image)
             
         h, w = gray.shape[:2]
         max_dim = 800
+        scale_back = None  # Detection-to-original coordinate factor, None when not resized
         if max(h, w) > max_dim:
             scale = max_dim / max(h, w)
             new_w, new_h = int(w * scale), int(h * scale)
             image_resized = cv2.resize(gray, (new_w, new_h))
+            scale_back = w / new_w
         else:
             image_resized = gray
             
-        all_keypoints = []
-        all_descriptors = []
+        points = np.empty((0, 2), dtype=np.float32)
+        descriptors = None
         
-        # ORB features - primary for speed
         try:
-            kp_orb, desc_orb = self.feature_detectors['orb'].detectAndCompute(image_resized, None)
-            if kp_orb is not None and desc_orb is not None:
-                all_keypoints.extend(kp_orb)
-                all_descriptors.append(desc_orb)
+            orb_input = cv2.UMat(image_resized) if self._use_umat else image_resized
+            if fast is None:
+                fast = self.keypoint_stabilized
+            orb = self.orb_fast if fast else self.orb
+            kp_orb, desc_orb = orb.detectAndCompute(orb_input, None)
+            if isinstance(desc_orb, cv2.UMat):
+                desc_orb = desc_orb.get()
+            if kp_orb and desc_orb is not None:
+                points = cv2.KeyPoint_convert(kp_orb)
+                descriptors = desc_orb
         except Exception as e:
-            print(f"ORB feature extraction failed: {e}")
-        
-        # BRISK features - secondary
-        try:
-            kp_brisk, desc_brisk = self.feature_detectors['brisk'].detectAndCompute(image_resized, None)
-            if kp_brisk is not None and desc_brisk is not None:
-                all_keypoints.extend(kp_brisk)
-                all_descriptors.append(desc_brisk)
-        except Exception as e:
-            print(f"BRISK feature extraction failed: {e}")
+            self._log_error('orb', f"[ERR] ORB feature extraction failed: {e}")
         
         # Scale keypoints back to original coordinates
-        if max(h, w) > max_dim:
-            scale_factor = w / new_w
-            for kp in all_keypoints:
-                kp.pt = (kp.pt[0] * scale_factor, kp.pt[1] * scale_factor)
-                kp.size = kp.size * scale_factor
-        
-        # Combine descriptors
-        if all_descriptors:
-            if len(all_descriptors) == 1:
-                combined_descriptors = all_descriptors[0]
-            else:
-                combined_descriptors = np.vstack(all_descriptors)
-        else:
-            combined_descriptors = None
+        if scale_back is not None:
+            points *= np.float32(scale_back)
             
-        return all_keypoints, combined_descriptors
+        return points, descriptors
+
+    def _reference_features(self, ref_gray):
+        """extract_features_fast() for a static reference image, computed once per image.
+        
+        Keyed on the array object, not its data pointer: live frames all share the
+        camera buffer's address. The entry keeps the image alive so its id can't be reused.
+        """
+        entry = self._ref_feat_cache.get(id(ref_gray))
+        if entry is None or entry[0] is not ref_gray:
+            # The reference is extracted once, so always with the full-strength detector
+            kp, desc = self.extract_features_fast(ref_gray, fast=False)
+            entry = (ref_gray, kp, desc)
+            with self._ref_feat_lock:
+                self._ref_feat_cache[id(ref_gray)] = entry
+        return entry[1], entry[2]
+
+    def _reset_reference_features(self, back_only=False):
+        """Drop cached reference features and unbind the matcher's reference descriptors.
+        
+        back_only keeps the front matching image's features and binding, for back reference changes.
+        """
+        with self._ref_feat_lock:
+            # Read under the lock: a concurrent front load publishes its matching image and seeds it here
+            keep = self.reference_gray_matching if back_only else None
+            entry = self._ref_feat_cache.get(id(keep)) if keep is not None else None
+            self._ref_feat_cache.clear()
+            self._template_cache.clear()
+            if entry is not None and entry[0] is keep:
+                self._ref_feat_cache[id(keep)] = entry
+        self.set_reference_descriptors(None, side='back')
+        if not back_only:
+            # The back side also matches against the front matching image, so it goes stale too
+            self.set_reference_descriptors(None, side='front')
+
+    def set_reference_descriptors(self, desc, side=None):
+        """Bind the reference descriptors that match_features_fast() queries against for side (default: current)"""
+        self._ref_desc[side or self.current_side] = None if desc is None or len(desc) == 0 else np.ascontiguousarray(desc)
 
-    def match_features_fast(self, desc1, desc2):
-        """Fast feature matching for binary descriptors"""
-        if desc1 is None or desc2 is None or len(desc1) == 0 or len(desc2) == 0:
+    def match_features_fast(self, desc_query):
+        """Fast feature matching of live binary descriptors against the current side's bound reference"""
+        desc_ref = self._ref_desc[self.current_side]
+        # The ratio test needs two live neighbours per reference descriptor
+        if desc_ref is None or desc_query is None or len(desc_query) < 2:
             return []
         
         try:
-            # For binary descriptors like ORB, BRISK
-            matches = self.matcher.knnMatch(desc1, desc2, k=2)
-            
-            # Apply ratio test
-            good_matches = []
-            for match_pair in matches:
-                if len(match_pair) == 2:
-                    m, n = match_pair
-                    if m.distance < self.good_match_ratio * n.distance:
-                        good_matches.append(m)
+            # Exact 2-NN Hamming search for every reference descriptor in one SIMD popcount pass
+            dist, nidx = cv2.batchDistance(desc_ref, desc_query, cv2.CV_32S, normType=cv2.NORM_HAMMING, K=2)
             
-            return good_matches
+            # Apply ratio test over all rows at once; only the survivors become DMatch objects
+            good = np.flatnonzero(dist[:, 0] < self.good_match_ratio * dist[:, 1])
+            # Gather survivors as Python lists up front instead of indexing numpy scalars per match
+            DMatch = cv2.DMatch
+            return [DMatch(q, t, d) for q, t, d in
+                    zip(good.tolist(), nidx[good, 0].tolist(), dist[good, 0].astype(np.float32).tolist())]
             
         except Exception as e:
-            print(f"Feature matching error: {e}")
+            self._log_error('match', f"[ERR] Feature matching error: {e}")
             return []
 
+    @staticmethod
+    def _match_indices(matches):
+        """(queryIdx, trainIdx) of matches as int arrays, for fancy-indexing the keypoint coordinate arrays"""
+        n = len(matches)
+        query_idx = np.fromiter((m.queryIdx for m in matches), dtype=np.intp, count=n)
+        train_idx = np.fromiter((m.trainIdx for m in matches), dtype=np.intp, count=n)
+        return query_idx, train_idx
+
     def transfer_with_homography(self, ref_kp, ref_desc, curr_kp, curr_desc, matches):
         """Homography-based keypoint transfer using perspective transformation"""
         if len(matches) < self.min_matches:
             return None, []
             
         try:
-            src_pts = np.float32([ref_kp[m.queryIdx].pt for m in matches]).reshape(-1, 1, 2)
-            dst_pts = np.float32([curr_kp[m.trainIdx].pt for m in matches]).reshape(-1, 1, 2)
+            query_idx, train_idx = self._match_indices(matches)
+            src_pts = ref_kp[query_idx].reshape(-1, 1, 2)
+            dst_pts = curr_kp[train_idx].reshape(-1, 1, 2)
             
-            # Find homography with RANSAC
-            H, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
+            # Find homography with MAGSAC++ (adaptive iterations; plain RANSAC on OpenCV < 4.5)
+            H, mask = cv2.findHomography(src_pts, dst_pts, HOMOGRAPHY_METHOD, 3.0, maxIters=2000, confidence=0.999)
             
             if H is None:
                 return None, []
             
+            # Reject early when most ratio-tested matches are outliers to the model
+            if mask is not None and mask.mean() < 0.5:
+                return None, []
+            
             # Check if homography is reasonable
             det = np.linalg.det(H)
             if 0.1 < abs(det) < 10.0:  # Reasonable scale change
-                # Transform all reference keypoints
-                transformed_points = []
+                # Transform all reference keypoints in one call
                 current_keypoints = self.keypoints if self.current_side == 'front' else self.back_keypoints
+                if not current_keypoints:
+                    return H, []
                 
-                for point in current_keypoints:
-                    src_point = np.array([[point[0], point[1]]], dtype=np.float32)
-                    src_point = src_point.reshape(-1, 1, 2)
-                    dst_point = cv2.perspectiveTransform(src_point, H)
-                    
-                    if len(dst_point) > 0:
-                        x, y = dst_point[0][0]
-                        transformed_points.append([x, y])
-                    else:
-                        transformed_points.append([-1, -1])
+                pts = np.asarray(current_keypoints, dtype=np.float32).reshape(-1, 1, 2)
+                transformed_points = cv2.perspectiveTransform(pts, H).reshape(-1, 2).tolist()
                 
                 return H, transformed_points
             
             return None, []
             
         except Exception as e:
-            print(f"Homography transfer error: {e}")
+            self._log_error('homography', f"[ERR] Homography transfer error: {e}")
             return None, []
 
     def transfer_with_mls(self, ref_kp, ref_desc, curr_kp, curr_desc, matches):
@@ -861,45 +1048,28 @@ class LiveKeypointDistanceMeasurer:
             
         try:
             # Extract matched points
-            src_pts = np.float32([ref_kp[m.queryIdx].pt for m in matches])
-            dst_pts = np.float32([curr_kp[m.trainIdx].pt for m in matches])
+            query_idx, train_idx = self._match_indices(matches)
+            src_pts = ref_kp[query_idx]
+            dst_pts = curr_kp[train_idx]
             
             current_keypoints = self.keypoints if self.current_side == 'front' else self.back_keypoints
-            transformed_points = []
+            kp = np.asarray(current_keypoints, dtype=np.float64).reshape(-1, 2)
             
-            for ref_point in current_keypoints:
-                # For each reference keypoint, compute MLS transformation
-                total_weight = 0
-                weighted_x = 0
-                weighted_y = 0
-                
-                for i, match in enumerate(matches):
-                    src_match_pt = src_pts[i]
-                    dst_match_pt = dst_pts[i]
-                    
-                    # Calculate distance between reference keypoint and this matched point
-                    distance = np.linalg.norm(np.array(ref_point) - src_match_pt)
-                    
-                    if distance < 1e-6:  # Avoid division by zero
-                        weight = 1e6
-                    else:
-                        weight = 1.0 / (distance ** (2 * self.alpha))
-                    
-                    total_weight += weight
-                    weighted_x += weight * dst_match_pt[0]
-                    weighted_y += weight * dst_match_pt[1]
-                
-                if total_weight > 0:
-                    x = weighted_x / total_weight
-                    y = weighted_y / total_weight
-                    transformed_points.append([x, y])
-                else:
-                    transformed_points.append([-1, -1])
+            # Inverse-distance weights for every (reference keypoint, match) pair at once: w = 1 / d^(2*alpha)
+            diff = kp[:, None, :] - src_pts[None, :, :].astype(np.float64)
+            dist2 = np.einsum('kmi,kmi->km', diff, diff)
+            with np.errstate(divide='ignore'):
+                weights = np.where(dist2 < 1e-12, 1e6, dist2 ** -self.alpha)  # Avoid division by zero
+            
+            total_weight = weights.sum(axis=1)
+            transformed = (weights @ dst_pts.astype(np.float64)) / total_weight[:, None]
+            transformed[~(total_weight > 0)] = -1
+            transformed_points = transformed.tolist()
             
             return None, transformed_points
             
         except Exception as e:
-            print(f"MLS transfer error: {e}")
+            self._log_error('mls', f"[ERR] MLS transfer error: {e}")
             return None, []
 
     def estimate_scale_change(self, kp1, kp2, matches):
@@ -907,31 +1077,20 @@ class LiveKeypointDistanceMeasurer:
         if len(matches) < 4:
             return 1.0
             
-        src_pts = np.float32([kp1[m.queryIdx].pt for m in matches])
-        dst_pts = np.float32([kp2[m.trainIdx].pt for m in matches])
+        query_idx, train_idx = self._match_indices(matches)
+        src_pts = kp1[query_idx]
+        dst_pts = kp2[train_idx]
         
-        # Calculate distances between all pairs in both sets
-        ref_distances = []
-        curr_distances = []
+        # Calculate distances between all pairs in both sets (same i<j pair order)
+        ref_distances = pdist(src_pts)
+        curr_distances = pdist(dst_pts)
         
-        for i in range(len(matches)):
-            for j in range(i+1, len(matches)):
-                ref_dist = np.linalg.norm(src_pts[i] - src_pts[j])
-                curr_dist = np.linalg.norm(dst_pts[i] - dst_pts[j])
-                if ref_dist > 10:  # Only consider significant distances
-                    ref_distances.append(ref_dist)
-                    curr_distances.append(curr_dist)
-        
-        if len(ref_distances) == 0:
+        significant = ref_distances > 10  # Only consider significant distances
+        if not significant.any():
             return 1.0
             
         # Calculate median scale change
-        scales = [curr_d / ref_d for curr_d, ref_d in zip(curr_distances, ref_distances) if ref_d > 0]
-        
-        if len(scales) == 0:
-            return 1.0
-            
-        median_scale = np.median(scales)
+        median_scale = np.median(curr_distances[significant] / ref_distances[significant])
         
         # Smooth scale changes
         smoothed_scale = (self.last_detected_scale * (1 - self.scale_smoothing_factor) + 
@@ -940,6 +1099,118 @@ class LiveKeypointDistanceMeasurer:
         
         return smoothed_scale
 
+    def _coarse_template(self, template):
+        """template pyrDown'ed template_pyramid_levels times, or None if it is too small to survive that"""
+        levels = self.template_pyramid_levels
+        if levels == 0 or min(template.shape[:2]) < 8 << levels:
+            return None
+        for _ in range(levels):
+            template = cv2.pyrDown(template)
+        return template
+
+    def _reference_templates(self, ref_gray, template_rects):
+        """(template, coarse template) per rect, cached across frames.
+        
+        The annotation keypoints and the reference are fixed while measuring, so the
+        templates only change with the reference image or the scale-dependent template size.
+        """
+        key = (id(ref_gray), self.template_pyramid_levels, tuple(map(tuple, template_rects)))
+        entry = self._template_cache.get(key)
+        if entry is None or entry[0] is not ref_gray:
+            templates = []
+            for x1, y1, x2, y2 in template_rects:
+                template = ref_gray[y1:y2, x1:x2]
+                templates.append((template, self._coarse_template(template) if template.size else None))
+            if len(self._template_cache) >= 8:
+                self._template_cache.clear()
+            entry = (ref_gray, templates)
+            self._template_cache[key] = entry
+        return entry[1]
+
+    def _match_template_pyramid(self, search_region, template, methods=(cv2.TM_CCOEFF_NORMED,), small_template=None):
+        """Coarse-to-fine cv2.matchTemplate; returns the best (max_val, max_loc) over the normalized
+        correlation methods, in search_region coordinates.
+        
+        Localizes at 1/2^levels scale, then re-runs the match at full resolution only in a
+        small window around the predicted location, so max_val keeps its full-res meaning.
+        The pyramids are built once and shared by all methods; pass small_template to reuse
+        a cached coarse template.
+        """
+        th, tw = template.shape[:2]
+        levels = self.template_pyramid_levels
+        step = 1 << levels
+        best_val, best_loc = -1, (0, 0)
+        if small_template is None:
+            small_template = self._coarse_template(template)
+        
+        if small_template is None:
+            # Template too small to survive downsampling; search at full resolution
+            for method in methods:
+                _, max_val, _, max_loc = cv2.minMaxLoc(cv2.matchTemplate(search_region, template, method))
+                if max_val > best_val:
+                    best_val, best_loc = max_val, max_loc
+            return best_val, best_loc
+        
+        small_search = search_region
+        for _ in range(levels):
+            small_search = cv2.pyrDown(small_search)
+        
+        sh, sw = search_region.shape[:2]
+        margin = 2 * step
+        for method in methods:
+            _, _, _, coarse_loc = cv2.minMaxLoc(cv2.matchTemplate(small_search, small_template, method))
+            
+            # Refine within +-2 coarse pixels of the prediction at full resolution
+            rx1 = max(0, coarse_loc[0] * step - margin)
+            ry1 = max(0, coarse_loc[1] * step - margin)
+            rx2 = min(sw, coarse_loc[0] * step + margin + tw)
+            ry2 = min(sh, coarse_loc[1] * step + margin + th)
+            result = cv2.matchTemplate(search_region[ry1:ry2, rx1:rx2], template, method)
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            if max_val > best_val:
+                best_val, best_loc = max_val, (rx1 + max_loc[0], ry1 + max_loc[1])
+        return best_val, best_loc
+
+    @staticmethod
+    def _template_windows(keypoints, template_size, search_half_size, scale_factor, ref_shape, live_shape):
+        """Template and search rectangles (x1, y1, x2, y2) for all keypoints in one numpy pass,
+        each clipped to its image. Returned as lists of Python ints for cheap slicing.
+        """
+        ref_h, ref_w = ref_shape[:2]
+        h, w = live_shape[:2]
+        half_size = template_size // 2
+        
+        # int() semantics: truncate toward zero
+        kp = np.asarray(keypoints, dtype=np.float64).reshape(-1, 2).astype(np.int64)
+        x, y = kp[:, 0], kp[:, 1]
+        templates = np.stack([np.maximum(0, x - half_size), np.maximum(0, y - half_size),
+                              np.minimum(ref_w, x + half_size), np.minimum(ref_h, y + half_size)], axis=1)
+        
+        # Estimate position based on scale
+        ex = (x * scale_factor).astype(np.int64)
+        ey = (y * scale_factor).astype(np.int64)
+        searches = np.stack([np.maximum(0, ex - search_half_size), np.maximum(0, ey - search_half_size),
+                             np.minimum(w, ex + search_half_size), np.minimum(h, ey + search_half_size)], axis=1)
+        return templates.tolist(), searches.tolist()
+
+    def _match_one_template(self, live_gray, min_size, methods, threshold, template_rect, templates, search_rect):
+        """Match one keypoint's reference template inside its live search window; returns [x, y] or [-1, -1]"""
+        x1, y1, x2, y2 = template_rect
+        sx1, sy1, sx2, sy2 = search_rect
+        if x2 - x1 < min_size or y2 - y1 < min_size or sx2 - sx1 < x2 - x1 or sy2 - sy1 < y2 - y1:
+            return [-1, -1]
+        
+        template, small_template = templates
+        try:
+            max_val, max_loc = self._match_template_pyramid(live_gray[sy1:sy2, sx1:sx2], template, methods, small_template)
+        except Exception:
+            return [-1, -1]
+        
+        if max_val > threshold:
+            # Found good match: report the template centre
+            return [sx1 + max_loc[0] + (x2 - x1) // 2, sy1 + max_loc[1] + (y2 - y1) // 2]
+        return [-1, -1]
+
     def template_match_keypoints(self, current_gray, scale_factor=1.0):
         """Template matching fallback for keypoint transfer using grayscale"""
         current_reference_gray = self.reference_gray if self.current_side == 'front' else self.back_reference_gray
@@ -947,68 +1218,17 @@ class LiveKeypointDistanceMeasurer:
         
         if current_reference_gray is None or len(current_keypoints) == 0:
             return []
-            
-        h, w = current_gray.shape[:2]
-        ref_h, ref_w = current_reference_gray.shape[:2]
         
-        transferred_points = []
+        # Adjust template size based on scale; search region expanded based on scale
+        template_size = int(self.template_roi_size * scale_factor)
+        search_half_size = int(template_size * 2.0 * scale_factor)
+        templates, searches = self._template_windows(current_keypoints, template_size, search_half_size, scale_factor,
+                                                     current_reference_gray.shape, current_gray.shape)
         
-        for i, keypoint in enumerate(current_keypoints):
-            # Create template around keypoint in reference image
-            x, y = int(keypoint[0]), int(keypoint[1])
-            
-            # Adjust template size based on scale
-            template_size = int(self.template_roi_size * scale_factor)
-            half_size = template_size // 2
-            
-            # Extract template from reference (with bounds checking)
-            x1 = max(0, x - half_size)
-            y1 = max(0, y - half_size)
-            x2 = min(ref_w, x + half_size)
-            y2 = min(ref_h, y + half_size)
-            
-            if x2 - x1 < 10 or y2 - y1 < 10:
-                transferred_points.append([-1, -1])
-                continue
-                
-            template = current_reference_gray[y1:y2, x1:x2]
-            
-            # Search region in current frame (expanded based on scale)
-            search_multiplier = 2.0 * scale_factor
-            search_half_size = int(template_size * search_multiplier)
-            
-            # Estimate position based on scale
-            estimated_x = int(x * scale_factor)
-            estimated_y = int(y * scale_factor)
-            
-            sx1 = max(0, estimated_x - search_half_size)
-            sy1 = max(0, estimated_y - search_half_size)
-            sx2 = min(w, estimated_x + search_half_size)
-            sy2 = min(h, estimated_y + search_half_size)
-            
-            if sx2 - sx1 < template.shape[1] or sy2 - sy1 < template.shape[0]:
-                transferred_points.append([-1, -1])
-                continue
-                
-            search_region = current_gray[sy1:sy2, sx1:sx2]
-            
-            try:
-                # Perform template matching
-                result = cv2.matchTemplate(search_region, template, cv2.TM_CCOEFF_NORMED)
-                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-                
-                if max_val > self.template_matching_threshold:
-                    # Found good match
-                    match_x = sx1 + max_loc[0] + template.shape[1] // 2
-                    match_y = sy1 + max_loc[1] + template.shape[0] // 2
-                    transferred_points.append([match_x, match_y])
-                else:
-                    transferred_points.append([-1, -1])
-                    
-            except Exception as e:
-                transferred_points.append([-1, -1])
-        
-        return transferred_points
+        match_one = partial(self._match_one_template, current_gray, 10,
+                            (cv2.TM_CCOEFF_NORMED,), self.template_matching_threshold)
+        return list(self._template_pool.map(match_one, templates,
+                                            self._reference_templates(current_reference_gray, templates), searches))
 
     def template_match_corners(self, current_gray, scale_factor=1.0):
         """Enhanced template matching specifically for corner keypoints"""
@@ -1017,81 +1237,20 @@ class LiveKeypointDistanceMeasurer:
         
         if current_reference_gray is None or len(current_keypoints) == 0:
             return []
-            
-        h, w = current_gray.shape[:2]
-        ref_h, ref_w = current_reference_gray.shape[:2]
-        
-        corner_points = []
         
+        # Use larger template and search region for corners
+        template_size = int(self.corner_template_size * scale_factor)
+        search_half_size = int(template_size * 2.5 * scale_factor)
         # Process only corner keypoints (first 12)
-        for i in range(min(self.corner_keypoints_count, len(current_keypoints))):
-            keypoint = current_keypoints[i]
-            x, y = int(keypoint[0]), int(keypoint[1])
-            
-            # Use larger template for corners
-            template_size = int(self.corner_template_size * scale_factor)
-            half_size = template_size // 2
-            
-            # Extract template from reference
-            x1 = max(0, x - half_size)
-            y1 = max(0, y - half_size)
-            x2 = min(ref_w, x + half_size)
-            y2 = min(ref_h, y + half_size)
-            
-            if x2 - x1 < 20 or y2 - y1 < 20:
-                corner_points.append([-1, -1])
-                continue
-                
-            template = current_reference_gray[y1:y2, x1:x2]
-            
-            # Larger search region for corners
-            search_multiplier = 2.5 * scale_factor
-            search_half_size = int(template_size * search_multiplier)
-            
-            estimated_x = int(x * scale_factor)
-            estimated_y = int(y * scale_factor)
-            
-            sx1 = max(0, estimated_x - search_half_size)
-            sy1 = max(0, estimated_y - search_half_size)
-            sx2 = min(w, estimated_x + search_half_size)
-            sy2 = min(h, estimated_y + search_half_size)
-            
-            if sx2 - sx1 < template.shape[1] or sy2 - sy1 < template.shape[0]:
-                corner_points.append([-1, -1])
-                continue
-                
-            search_region = current_gray[sy1:sy2, sx1:sx2]
-            
-            try:
-                # Try multiple template matching methods for corners
-                methods = [cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED]
-                best_match_val = -1
-                best_match_loc = (0, 0)
-                
-                for method in methods:
-                    result = cv2.matchTemplate(search_region, template, method)
-                    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-                    
-                    if method == cv2.TM_CCOEFF_NORMED or method == cv2.TM_CCORR_NORMED:
-                        if max_val > best_match_val:
-                            best_match_val = max_val
-                            best_match_loc = max_loc
-                    else:
-                        if min_val > best_match_val:
-                            best_match_val = min_val
-                            best_match_loc = min_loc
-                
-                if best_match_val > self.corner_matching_threshold:
-                    match_x = sx1 + best_match_loc[0] + template.shape[1] // 2
-                    match_y = sx1 + best_match_loc[1] + template.shape[0] // 2
-                    corner_points.append([match_x, match_y])
-                else:
-                    corner_points.append([-1, -1])
-                    
-            except Exception as e:
-                corner_points.append([-1, -1])
-        
-        return corner_points
+        templates, searches = self._template_windows(current_keypoints[:self.corner_keypoints_count], template_size,
+                                                     search_half_size, scale_factor,
+                                                     current_reference_gray.shape, current_gray.shape)
+        
+        # Try multiple template matching methods for corners
+        match_one = partial(self._match_one_template, current_gray, 20,
+                            (cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED), self.corner_matching_threshold)
+        return list(self._template_pool.map(match_one, templates,
+                                            self._reference_templates(current_reference_gray, templates), searches))
 
     def detect_corners_robust(self, current_gray, scale_factor=1.0):
         """ENHANCED: Robust corner detection using multiple methods including Shi-Tomasi"""
@@ -1105,108 +1264,70 @@ class LiveKeypointDistanceMeasurer:
         # Method 1: Enhanced template matching for corners
         template_points = self.template_match_corners(current_gray, scale_factor)
         
-        # Method 2: Shi-Tomasi corner detection (NEW)
-        shitomasi_points = []
+        # Fuse with priority Template > Shi-Tomasi > Harris: the detectors only run where
+        # every higher-priority method missed
+        fused_corners = list(template_points)
+        search_size = int(150 * scale_factor)
+        half_size = search_size // 2
         
-        for i in range(min(self.corner_keypoints_count, len(current_keypoints))):
-            keypoint = current_keypoints[i]
-            x, y = int(keypoint[0] * scale_factor), int(keypoint[1] * scale_factor)
+        for i, point in enumerate(template_points):
+            if point[0] != -1:
+                continue
             
             # Define search region around expected corner position
-            search_size = int(150 * scale_factor)
-            half_size = search_size // 2
-            
+            keypoint = current_keypoints[i]
+            x, y = int(keypoint[0] * scale_factor), int(keypoint[1] * scale_factor)
             x1 = max(0, x - half_size)
             y1 = max(0, y - half_size)
             x2 = min(w, x + half_size)
             y2 = min(h, y + half_size)
             
             if x2 - x1 < 50 or y2 - y1 < 50:
-                shitomasi_points.append([-1, -1])
                 continue
                 
             search_region = current_gray[y1:y2, x1:x2]
             
+            # Method 2: Shi-Tomasi corner detection
             try:
-                # Shi-Tomasi corner detection
                 corners = cv2.goodFeaturesToTrack(search_region, maxCorners=1, 
                                                 qualityLevel=0.01, minDistance=10)
-                
                 if corners is not None and len(corners) > 0:
                     # Get the strongest corner
-                    corner_x = x1 + corners[0][0][0]
-                    corner_y = y1 + corners[0][0][1]
-                    shitomasi_points.append([corner_x, corner_y])
-                else:
-                    shitomasi_points.append([-1, -1])
-                    
+                    fused_corners[i] = [x1 + corners[0][0][0], y1 + corners[0][0][1]]
+                    continue
             except Exception as e:
-                shitomasi_points.append([-1, -1])
-        
-        # Method 3: Harris corner detection (fallback)
-        harris_points = []
-        
-        for i in range(min(self.corner_keypoints_count, len(current_keypoints))):
-            keypoint = current_keypoints[i]
-            x, y = int(keypoint[0] * scale_factor), int(keypoint[1] * scale_factor)
-            
-            search_size = int(150 * scale_factor)
-            half_size = search_size // 2
-            
-            x1 = max(0, x - half_size)
-            y1 = max(0, y - half_size)
-            x2 = min(w, x + half_size)
-            y2 = min(h, y + half_size)
-            
-            if x2 - x1 < 50 or y2 - y1 < 50:
-                harris_points.append([-1, -1])
-                continue
-                
-            search_region = current_gray[y1:y2, x1:x2]
+                pass
             
+            # Method 3: Harris corner detection (fallback)
             try:
-                # Harris corner detection
                 harris_response = cv2.cornerHarris(search_region, 2, 3, 0.04)
-                
                 min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(harris_response)
-                
                 if max_val > 0.01:
-                    corner_x = x1 + max_loc[0]
-                    corner_y = y1 + max_loc[1]
-                    harris_points.append([corner_x, corner_y])
-                else:
-                    harris_points.append([-1, -1])
-                    
+                    fused_corners[i] = [x1 + max_loc[0], y1 + max_loc[1]]
             except Exception as e:
-                harris_points.append([-1, -1])
-        
-        # Fuse results with priority: Template > Shi-Tomasi > Harris
-        fused_corners = []
-        for i in range(len(template_points)):
-            if template_points[i][0] != -1:
-                fused_corners.append(template_points[i])
-            elif i < len(shitomasi_points) and shitomasi_points[i][0] != -1:
-                fused_corners.append(shitomasi_points[i])
-            elif i < len(harris_points) and harris_points[i][0] != -1:
-                fused_corners.append(harris_points[i])
-            else:
-                fused_corners.append([-1, -1])
+                pass
         
         return fused_corners
 
-    def transfer_keypoints_robust(self, current_gray):
+    def transfer_keypoints_robust(self, current_gray, recovering=False):
         """Robust keypoint transfer using multiple methods with grayscale processing
         
         RESOLUTION-AWARE: Performs matching at webcam resolution to avoid issues with
-        upscaled reference images that have blurry features.
+        upscaled reference images that have blurry features. recovering forces the full
+        ORB detector, since keypoint_stabilized is stale once optical flow lost the track.
         """
         current_reference_gray = self.reference_gray if self.current_side == 'front' else self.back_reference_gray
         current_keypoints = self.keypoints if self.current_side == 'front' else self.back_keypoints
         
         if current_reference_gray is None or len(current_keypoints) == 0:
-            print(f"[DEBUG] transfer_keypoints_robust: ref_gray={current_reference_gray is not None}, keypoints={len(current_keypoints)}")
+            self._log_error('transfer_no_reference',
+                            f"[DEBUG] transfer_keypoints_robust: ref_gray={current_reference_gray is not None}, keypoints={len(current_keypoints)}")
             return []
         
+        self._transfer_count += 1
+        verbose = self._transfer_count % self.transfer_log_interval == 0
+        self._last_transfer_homography = False
+        
         # Get matching-resolution reference image and keypoints
         ref_gray_for_matching = self.reference_gray_matching if self.reference_gray_matching is not None else current_reference_gray
         keypoints_for_matching = self.keypoints_matching if self.keypoints_matching else current_keypoints
@@ -1219,6 +1340,7 @@ class LiveKeypointDistanceMeasurer:
         scale_up_x = live_width / ref_width  # To scale matched points back to live resolution
         scale_up_y = live_height / ref_height
         need_scale_up = abs(scale_up_x - 1.0) > 0.01 or abs(scale_up_y - 1.0) > 0.01
+        self._flow_scale = (scale_up_x, scale_up_y) if need_scale_up else (1.0, 1.0)
         
         # Resize live frame to matching resolution if needed
         if need_scale_up:
@@ -1246,14 +1368,18 @@ class LiveKeypointDistanceMeasurer:
         try:
             # METHOD 1: Feature-based matching with homography/MLS
             # Use matching-resolution images for feature extraction
-            ref_kp, ref_desc = self.extract_features_fast(ref_gray_for_matching)
-            curr_kp, curr_desc = self.extract_features_fast(current_gray_matching)
+            ref_kp, ref_desc = self._reference_features(ref_gray_for_matching)
+            curr_kp, curr_desc = self.extract_features_fast(current_gray_matching,
+                                                            fast=False if recovering else None)
+            if self._ref_desc[self.current_side] is None and ref_desc is not None:
+                self.set_reference_descriptors(ref_desc)
             
             feature_points = []
+            matches = []
             scale_factor = 1.0
             
             if ref_desc is not None and curr_desc is not None and len(ref_desc) > 0 and len(curr_desc) > 0:
-                matches = self.match_features_fast(ref_desc, curr_desc)
+                matches = self.match_features_fast(curr_desc)
                 
                 if len(matches) >= self.min_matches:
                     # Estimate scale change
@@ -1265,17 +1391,21 @@ class LiveKeypointDistanceMeasurer:
                         H, homography_points = self.transfer_with_homography(ref_kp, ref_desc, curr_kp, curr_desc, matches)
                         if homography_points:
                             feature_points = homography_points
-                            print("[FIX] Using Homography transfer")
+                            self._last_transfer_homography = True
+                            if verbose:
+                                print("[FIX] Using Homography transfer")
                         else:
                             # Fallback to MLS
                             _, mls_points = self.transfer_with_mls(ref_kp, ref_desc, curr_kp, curr_desc, matches)
                             feature_points = mls_points
-                            print("[FIX] Using MLS transfer (homography fallback)")
+                            if verbose:
+                                print("[FIX] Using MLS transfer (homography fallback)")
                     else:
                         # Use MLS for fewer matches or non-rigid deformation
                         _, mls_points = self.transfer_with_mls(ref_kp, ref_desc, curr_kp, curr_desc, matches)
                         feature_points = mls_points
-                        print("[FIX] Using MLS transfer")
+                        if verbose:
+                            print("[FIX] Using MLS transfer")
                 else:
                     feature_points = [[-1, -1]] * len(current_keypoints)
             else:
@@ -1351,11 +1481,13 @@ class LiveKeypointDistanceMeasurer:
             
             # Print transfer method statistics
             if len(matches) >= self.min_matches:
-                print(f"[STAT] Transfer: {len(matches)} matches, {valid_feature_count}/{len(current_keypoints)} feature points, {valid_template_count}/{len(current_keypoints)} template points, {valid_corner_count}/{min(self.corner_keypoints_count, len(current_keypoints))} corner points")
+                if verbose:
+                    print(f"[STAT] Transfer: {len(matches)} matches, {valid_feature_count}/{len(current_keypoints)} feature points, {valid_template_count}/{len(current_keypoints)} template points, {valid_corner_count}/{min(self.corner_keypoints_count, len(current_keypoints))} corner points")
             else:
                 # DEBUG: Print when no tracking is working
-                print(f"[WARN] Keypoint transfer failed: matches={len(matches) if 'matches' in locals() else 0}, min_required={self.min_matches}")
-                print(f"[WARN] Feature descriptors - ref: {len(ref_desc) if ref_desc is not None else 0}, curr: {len(curr_desc) if curr_desc is not None else 0}")
+                self._log_error('transfer_failed',
+                                f"[WARN] Keypoint transfer failed: matches={len(matches)}, min_required={self.min_matches}\n"
+                                f"[WARN] Feature descriptors - ref: {len(ref_desc) if ref_desc is not None else 0}, curr: {len(curr_desc) if curr_desc is not None else 0}")
             
             # Apply stabilization to fused points
             stabilized_points = self.stabilize_keypoints(fused_points)
@@ -1375,10 +1507,58 @@ class LiveKeypointDistanceMeasurer:
             return stabilized_points
             
         except Exception as e:
-            print(f"Error in robust keypoint transfer: {e}")
+            self._log_error('transfer', f"[ERR] Error in robust keypoint transfer: {e}")
             # Fallback to simple template matching
             return self.template_match_keypoints(current_gray, 1.0)
 
+    def _reset_flow_tracking(self, live_gray=None, points=None):
+        """Seed optical-flow tracking from a full transfer; called without arguments it stops tracking"""
+        self._flow_frames = 0
+        self._prev_gray = None
+        self._flow_lost = False
+        if live_gray is None or not points:
+            return
+        pts = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        idx = np.flatnonzero((pts[:, 0] != -1) & (pts[:, 1] != -1))
+        if len(idx) == 0:
+            return
+        self._prev_gray = live_gray.copy()  # live frames alias the camera buffer
+        self._prev_tracked = pts[idx].reshape(-1, 1, 2)
+        self._prev_tracked_idx = idx
+        self._prev_count = len(pts)
+
+    def track_keypoints_optical_flow(self, live_gray):
+        """Track the last transferred keypoints with pyramidal LK; returns None when a full transfer is needed"""
+        if self._prev_gray is None or self._flow_frames >= self.flow_max_frames:
+            return None
+        if self._prev_gray.shape != live_gray.shape:
+            self._flow_lost = True
+            return None
+        
+        new_pts, status, _ = cv2.calcOpticalFlowPyrLK(
+            self._prev_gray, live_gray, self._prev_tracked, None, winSize=(21, 21), maxLevel=3
+        )
+        if new_pts is None or status.mean() <= self.flow_min_status:
+            self._flow_lost = True
+            return None
+        
+        # Points LK lost stay at -1 here; the stabilizer holds them at their last valid position
+        ok = status.ravel() == 1
+        scale = np.array(self._flow_scale, dtype=np.float32)
+        points = np.full((self._prev_count, 2), -1, dtype=np.float32)
+        points[self._prev_tracked_idx[ok]] = new_pts.reshape(-1, 2)[ok] / scale
+        
+        self._prev_gray = live_gray.copy()
+        self._prev_tracked = new_pts[ok]
+        self._prev_tracked_idx = self._prev_tracked_idx[ok]
+        self._flow_frames += 1
+        
+        # Stabilize at matching resolution like transfer_keypoints_robust, then scale back to live
+        stabilized = np.asarray(self.stabilize_keypoints(points.tolist()), dtype=np.float32).reshape(-1, 2)
+        valid = (stabilized[:, 0] != -1) & (stabilized[:, 1] != -1)
+        stabilized[valid] *= scale
+        return stabilized.tolist()
+
     def stabilize_keypoints(self, new_keypoints):
         """Enhanced stabilization that allows for real movement but reduces jitter"""
         if not self.last_valid_keypoints or len(self.last_valid_keypoints) != len(new_keypoints):
@@ -1866,8 +2046,7 @@ class LiveKeypointDistanceMeasurer:
             if choice == '1':
                 # Load existing calibration and annotation
                 cal_loaded = self.load_calibration()
-                front_loaded = self.load_annotation()
-                back_loaded = self.load_back_annotation()
+                front_loaded, back_loaded = self.load_annotations()
                 
                 if cal_loaded and (front_loaded or back_loaded):
                     print("[OK] Successfully loaded previous data!")
@@ -1893,8 +2072,7 @@ class LiveKeypointDistanceMeasurer:
                     # Save calibration
                     self.save_calibration()
                     # Try to load existing annotation
-                    front_loaded = self.load_annotation()
-                    back_loaded = self.load_back_annotation()
+                    front_loaded, back_loaded = self.load_annotations()
                     if not front_loaded and not back_loaded:
                         print("[?] No annotation found. Please create annotation next.")
                     return True
@@ -2012,8 +2190,8 @@ class LiveKeypointDistanceMeasurer:
         # Check if valid calibration already exists
         if not force_new and os.path.exists(self.calibration_file):
             try:
-                with open(self.calibration_file, 'r') as f:
-                    cal_data = json.load(f)
+                with open(self.calibration_file, 'rb') as f:
+                    cal_data = json_loads(f.read())
                     if cal_data.get('pixels_per_cm', 0) > 0 and cal_data.get('reference_length_cm', 0) > 0:
                         # Valid calibration exists - use it without asking
                         self.pixels_per_cm = cal_data['pixels_per_cm']
@@ -2159,8 +2337,8 @@ class LiveKeypointDistanceMeasurer:
                     if not getattr(self, '_force_new_calibration', False):
                         if os.path.exists(self.calibration_file):
                             try:
-                                with open(self.calibration_file, 'r') as f:
-                                    old_cal = json.load(f)
+                                with open(self.calibration_file, 'rb') as f:
+                                    old_cal = json_loads(f.read())
                                     saved_reference_length = old_cal.get('reference_length_cm', 0)
                             except:
                                 pass
@@ -2780,6 +2958,7 @@ class LiveKeypointDistanceMeasurer:
             return False
         
         self.current_side = 'back'
+        self._reset_flow_tracking()
         self.transferred_keypoints = []
         self.is_keypoints_transferred = False
         self.keypoint_stabilized = False
@@ -2796,6 +2975,7 @@ class LiveKeypointDistanceMeasurer:
             return False
         
         self.current_side = 'front'
+        self._reset_flow_tracking()
         self.transferred_keypoints = []
         self.is_keypoints_transferred = False
         self.keypoint_stabilized = False
@@ -2835,6 +3015,7 @@ class LiveKeypointDistanceMeasurer:
         terminal_update_counter = 0
         self.keypoint_stabilized = False
         self.last_valid_keypoints = []
+        self._reset_flow_tracking()
         self.stabilization_frames = 0
         self.last_detected_scale = 1.0
         
@@ -2862,10 +3043,17 @@ class LiveKeypointDistanceMeasurer:
             if not self.paused:
                 current_time = time.time()
                 if current_time - self.last_transfer_time >= self.transfer_interval:
-                    if self.current_side == 'front':
-                        self.transferred_keypoints = self.transfer_keypoints_robust(frame_gray)
+                    # Cheap LK tracking on steady frames; full ORB transfer when it loses confidence
+                    tracked = self.track_keypoints_optical_flow(frame_gray)
+                    if tracked is not None:
+                        self.transferred_keypoints = tracked
                     else:
-                        self.transferred_keypoints = self.transfer_keypoints_robust(frame_gray)
+                        self.transferred_keypoints = self.transfer_keypoints_robust(
+                            frame_gray, recovering=self._flow_lost)
+                        if self._last_transfer_homography:
+                            self._reset_flow_tracking(frame_gray, self.transferred_keypoints)
+                        else:
+                            self._reset_flow_tracking()
                     self.last_transfer_time = current_time
                     if len(self.transferred_keypoints) > 0:
                         self.is_keypoints_transferred = True
@@ -3076,6 +3264,7 @@ class LiveKeypointDistanceMeasurer:
         finally:
             if self.camera_obj:
                 self.camera_obj.close()
+            self._template_pool.shutdown(wait=False)
             print("Measurement session ended")
 
 # Run the application